@@ -3,15 +3,40 @@
 #  Correction : Utilisation du dossier AppData pour les fichiers de données
 #  Dépendances : pip install pystray pillow win10toast
 # ======================================================================
+import time
+_STARTUP_T0 = time.perf_counter()
 import tkinter as tk
 from tkinter import font, messagebox
 import threading
 import sys
 import os
+import io
 import json
+import base64
+import math
+import mmap
+import struct
+import zlib
+import wave
+import queue
+import shutil
+import socket
+import secrets
+import hmac
+import subprocess
+import bisect
+import heapq
+import importlib
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from datetime import date
-from PIL import Image, ImageTk, ImageDraw, ImageFont
 import logging
+import logging.handlers
+import atexit
+import functools
+# PIL, pystray, win10toast, winsound et sqlite3 sont importés au premier usage (voir lazy_import)
 
 # --- NOUVELLE FONCTION pour gérer le chemin des données utilisateur ---
 def get_app_data_path(file_name):
@@ -44,28 +69,173 @@ def resource_path(relative_path):
         base_path = os.path.abspath(os.path.dirname(__file__))
     return os.path.join(base_path, relative_path)
 
-# --- MODIFICATION : Configuration du logging pour utiliser AppData ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(get_app_data_path("pomodoro.log")), # Utilise le nouveau chemin
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-try:
-    import pystray
-except ImportError:
-    messagebox.showerror("Dépendance Manquante", "Veuillez installer 'pystray' avec la commande : pip install pystray")
-    sys.exit(1)
-
-try:
-    import winsound
-    SOUND_ENABLED = True
-except ImportError:
-    logging.info("Module 'winsound' non trouvé. Les sons seront désactivés.")
-    SOUND_ENABLED = False
+# --- Journalisation non bloquante (QueueHandler / QueueListener) ---
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+class JsonLogFormatter(logging.Formatter):
+    """ Une ligne JSON par message ; les champs passés via extra={"fields": {...}} sont ajoutés tels quels. """
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def setup_logging(json_format=False, max_bytes=1_000_000, backup_count=3):
+    """ Le thread Tk ne fait que déposer les messages dans une file ; un thread d'écoute les écrit
+        dans pomodoro.log (rotation par taille, JSON optionnel avec --log-json) et sur stdout. """
+    file_handler = logging.handlers.RotatingFileHandler(get_app_data_path("pomodoro.log"), maxBytes=max_bytes,
+                                                        backupCount=backup_count, encoding="utf-8", delay=True)
+    file_handler.setFormatter(JsonLogFormatter() if json_format else logging.Formatter(LOG_FORMAT))
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    # Vide la file avant la fin du processus
+    atexit.register(listener.stop)
+    return listener
+
+# Les processus de rendu (multiprocessing) réimportent ce fichier sous le nom __mp_main__
+if __name__ != "__mp_main__":
+    log_listener = setup_logging(json_format="--log-json" in sys.argv)
+
+# --- Profil du démarrage et imports différés ---
+class StartupProfiler:
+    """ Chronomètre les phases du démarrage et le coût des imports différés (--profile-startup). """
+    def __init__(self, t0):
+        self.t0 = t0
+        self.phases = []
+        self.enabled = "--profile-startup" in sys.argv
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def record(self, name, start):
+        self.phases.append((name, time.perf_counter() - start))
+
+    def report(self):
+        lines = ["Profil du démarrage :"]
+        for name, duration in self.phases:
+            lines.append(f"  {name:<32} {duration * 1000:8.1f} ms")
+        lines.append(f"  {'total (jusqu au 1er affichage)':<32} {(time.perf_counter() - self.t0) * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+startup_profiler = StartupProfiler(_STARTUP_T0)
+startup_profiler.record("imports initiaux", _STARTUP_T0)
+
+def lazy_import(name):
+    """ Importe un module au premier usage seulement ; le coût est noté dans le profil du démarrage. """
+    module = sys.modules.get(name)
+    if module is None:
+        with startup_profiler.phase(f"import {name}"):
+            module = importlib.import_module(name)
+    return module
+
+# --- Chronométrage des sections critiques (--trace) ---
+class SpanTracer:
+    """ Histogrammes en mémoire des durées de sections chronométrées. Désactivé par défaut :
+        span() retourne alors un contexte vide partagé, sans mesure. """
+    BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(self, enabled=False, slow_ms=100):
+        self.enabled = enabled
+        # Au-delà de slow_ms une section est signalée dans le journal (None : jamais)
+        self.slow_ms = slow_ms
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._null_span = nullcontext()
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else self._null_span
+
+    def add(self, name, duration_ms):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = {"counts": [0] * (len(self.BUCKETS_MS) + 1), "n": 0, "total": 0.0, "max": 0.0}
+            histogram["counts"][bisect.bisect_left(self.BUCKETS_MS, duration_ms)] += 1
+            histogram["n"] += 1
+            histogram["total"] += duration_ms
+            histogram["max"] = max(histogram["max"], duration_ms)
+        if self.slow_ms is not None and duration_ms >= self.slow_ms:
+            logging.warning(f"Section lente : {name} {duration_ms:.1f} ms", extra={"fields": {"span": name, "ms": round(duration_ms, 3)}})
+
+    def percentile(self, name, fraction):
+        """ Borne supérieure du seuil contenant le percentile demandé (estimation par histogramme). """
+        histogram = self.histograms[name]
+        target = fraction * histogram["n"]
+        seen = 0
+        for index, count in enumerate(histogram["counts"]):
+            seen += count
+            if seen >= target:
+                return self.BUCKETS_MS[index] if index < len(self.BUCKETS_MS) else histogram["max"]
+        return histogram["max"]
+
+    def report(self):
+        lines = ["Sections chronométrées (ms) :", f"  {'section':<28} {'n':>7} {'moy':>8} {'p50<=':>7} {'p95<=':>7} {'max':>8}"]
+        with self._lock:
+            names = sorted(self.histograms, key=lambda name: -self.histograms[name]["total"])
+        for name in names:
+            histogram = self.histograms[name]
+            lines.append(f"  {name:<28} {histogram['n']:>7} {histogram['total'] / histogram['n']:>8.2f} "
+                         f"{self.percentile(name, 0.5):>7} {self.percentile(name, 0.95):>7} {histogram['max']:>8.2f}")
+        return "\n".join(lines)
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+tracer = SpanTracer("--trace" in sys.argv)
+
+def traced(name):
+    """ Décorateur : chronomètre chaque appel de la méthode sous le nom donné (si --trace). """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return method(*args, **kwargs)
+            with tracer.span(name):
+                return method(*args, **kwargs)
+        return wrapper
+    return decorator
+
+_pystray_error_shown = False
+
+def import_pystray():
+    """ Retourne le module pystray, ou None (avec un seul message d'erreur) s'il n'est pas installé. """
+    global _pystray_error_shown
+    try:
+        return lazy_import("pystray")
+    except ImportError:
+        if not _pystray_error_shown:
+            _pystray_error_shown = True
+            messagebox.showerror("Dépendance Manquante", "Veuillez installer 'pystray' avec la commande : pip install pystray")
+        return None
 
 # --- DÉFINITION DES THÈMES ---
 THEMES = {
@@ -84,109 +254,839 @@ THEMES = {
 }
 
 # --- Classes pour la gestion des données ---
-class DataManager:
+def write_json_atomic(path, obj, sync=True):
+    """ Écrit dans un fichier temporaire synchronisé sur disque, puis le renomme par-dessus la cible.
+        Le nom temporaire est propre au thread : deux écrivains ne partagent jamais le même fichier. """
+    tmp_file = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(obj, f, separators=(",", ":"))
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+class WriteBehindWriter:
+    """ Écriture différée sur un thread dédié : les demandes rapprochées sont fusionnées
+        et seule la dernière version en attente est écrite. """
+    def __init__(self, path, sync=True):
+        self.path = path
+        self.sync = sync
+        self.writes = 0
+        self.last_error = None
+        self._pending = None
+        self._writing = False
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, payload):
+        with self._cond:
+            self._pending = payload
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                payload, self._pending = self._pending, None
+                self._writing = True
+            try:
+                write_json_atomic(self.path, payload, self.sync)
+                self.writes += 1
+                self.last_error = None
+            except Exception as e:
+                logging.error(f"Erreur sauvegarde données: {e}")
+                self.last_error = e
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def flush(self, timeout=5.0):
+        """ Attend que toutes les écritures en attente soient sur disque. """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+class StatsLog:
+    """ Journal des statistiques en ajout seul : une ligne JSON par événement, un index en mémoire,
+        et un instantané compacté périodiquement en arrière-plan. """
+    COMPACT_EVERY = 200
+
+    def __init__(self, log_file, snapshot_file, legacy_file=None):
+        self.log_file = log_file
+        self.snapshot_file = snapshot_file
+        self.legacy_file = legacy_file
+        self.stats = {}
+        self.seq = 0
+        self.records_since_snapshot = 0
+        self._lock = threading.Lock()
+        # Une seule compaction à la fois (arrière-plan ou fermeture)
+        self._compact_lock = threading.Lock()
+        self._compacting = False
+
+    def load(self):
+        """ Reconstruit l'index : instantané (ou ancien stats.json) puis rejoue le journal. """
+        base_seq = 0
+        try:
+            with open(self.snapshot_file, "r") as f:
+                snapshot = json.load(f)
+            self.stats = dict(snapshot.get("stats", {}))
+            base_seq = snapshot.get("seq", 0)
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            self.stats = self._load_legacy()
+        self.seq = base_seq
+        self.records_since_snapshot = 0
+        for record in self._read_records():
+            if record.get("seq", 0) <= base_seq:
+                continue
+            self._apply(record)
+            self.seq = record["seq"]
+            self.records_since_snapshot += 1
+        if self.records_since_snapshot >= self.COMPACT_EVERY:
+            self.compact_async()
+        return self.stats
+
+    def _load_legacy(self):
+        if not self.legacy_file:
+            return {}
+        try:
+            with open(self.legacy_file, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _read_records(self):
+        try:
+            with open(self.log_file, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return []
+        # Une écriture interrompue laisse au plus une dernière ligne incomplète : on la coupe
+        if raw and not raw.endswith(b"\n"):
+            good_size = raw.rfind(b"\n") + 1
+            logging.warning("Journal stats : dernière ligne incomplète ignorée.")
+            with open(self.log_file, "r+b") as f:
+                f.truncate(good_size)
+            raw = raw[:good_size]
+        records = []
+        for line in raw.splitlines():
+            try:
+                record = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                logging.warning("Journal stats : ligne illisible ignorée.")
+                continue
+            if isinstance(record, dict) and "seq" in record:
+                records.append(record)
+        return records
+
+    def _apply(self, record):
+        if record.get("clear"):
+            self.stats.clear()
+        else:
+            day = record["date"]
+            self.stats[day] = self.stats.get(day, 0) + record.get("delta", 1)
+
+    def _append(self, record):
+        with self._lock:
+            self.seq += 1
+            record["seq"] = self.seq
+            line = json.dumps(record, separators=(",", ":")) + "\n"
+            with open(self.log_file, "a") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(record)
+            self.records_since_snapshot += 1
+        if self.records_since_snapshot >= self.COMPACT_EVERY:
+            self.compact_async()
+
+    def record(self, day, delta=1):
+        self._append({"date": day, "delta": delta})
+
+    def clear(self):
+        self._append({"clear": True})
+
+    def compact_async(self):
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        threading.Thread(target=self._compact_in_background, daemon=True).start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def compact(self):
+        """ Écrit un instantané atomique puis retire du journal les lignes qu'il couvre.
+            Attend la fin d'une compaction en cours plutôt que de la doubler. """
+        with self._compact_lock:
+            try:
+                with self._lock:
+                    snapshot = {"seq": self.seq, "stats": dict(self.stats)}
+                write_json_atomic(self.snapshot_file, snapshot)
+                with self._lock:
+                    pending = [r for r in self._read_records() if r["seq"] > snapshot["seq"]]
+                    tmp_log = self.log_file + ".tmp"
+                    with open(tmp_log, "w") as f:
+                        for record in pending:
+                            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_log, self.log_file)
+                    self.records_since_snapshot = len(pending)
+            except Exception as e:
+                logging.error(f"Erreur compaction stats: {e}")
+
+DEFAULT_SETTINGS = {
+    "work_time_min": 25,
+    "short_break_min": 5,
+    "long_break_min": 15,
+    "pomodoros_per_cycle": 4,
+    "theme": "dark",
+    "auto_transition": True,
+    "progress_ring": True,
+    "timers": []
+}
+
+class DataManager(ABC):
+    """ Interface de stockage commune aux différents backends (JSON, SQLite).
+        Les méthodes *_task retournent False quand le backend n'a pas d'écriture ligne par ligne :
+        l'application fait alors une sauvegarde complète. record_pomodoro et clear_stats retournent
+        True si l'écriture a réussi. """
+    @abstractmethod
+    def load_data(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_data(self, data):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def add_task(self, task):
+        return False
+
+    def update_task(self, task):
+        return False
+
+    def delete_task(self, task):
+        return False
+
+    @abstractmethod
+    def load_stats(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def record_pomodoro(self, day):
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear_stats(self):
+        raise NotImplementedError
+
+    def save_stats(self):
+        pass
+
+class JsonDataManager(DataManager):
     def __init__(self):
         # --- MODIFICATION : Utilisation de AppData pour les fichiers de données ---
         self.data_file = get_app_data_path("data.json")
         self.stats_file = get_app_data_path("stats.json")
+        self.data_writer = WriteBehindWriter(self.data_file)
+        self.stats_log = StatsLog(get_app_data_path("stats.log"), get_app_data_path("stats.snapshot.json"), legacy_file=self.stats_file)
     
     def load_data(self):
         try:
             with open(self.data_file, "r") as f:
                 data = json.load(f)
                 settings = data.get("settings", {})
-                return {
-                    "work_time_min": settings.get("work_time_min", 25),
-                    "short_break_min": settings.get("short_break_min", 5),
-                    "long_break_min": settings.get("long_break_min", 15),
-                    "pomodoros_per_cycle": settings.get("pomodoros_per_cycle", 4),
-                    "theme": settings.get("theme", "dark"),
-                    "auto_transition": settings.get("auto_transition", True),
-                    "tasks": data.get("tasks", [])
-                }
+                loaded = {key: settings.get(key, default) for key, default in DEFAULT_SETTINGS.items()}
+                loaded["tasks"] = data.get("tasks", [])
+                return loaded
         except (FileNotFoundError, json.JSONDecodeError):
-            return {
-                "work_time_min": 25,
-                "short_break_min": 5,
-                "long_break_min": 15,
-                "pomodoros_per_cycle": 4,
-                "theme": "dark",
-                "auto_transition": True,
-                "tasks": []
-            }
+            return dict(DEFAULT_SETTINGS, tasks=[])
     
     def save_data(self, data):
-        try:
-            with open(self.data_file, "w") as f:
-                json.dump({
-                    "settings": {
-                        "work_time_min": data["work_time_min"],
-                        "short_break_min": data["short_break_min"],
-                        "long_break_min": data["long_break_min"],
-                        "pomodoros_per_cycle": data["pomodoros_per_cycle"],
-                        "theme": data["theme"],
-                        "auto_transition": data["auto_transition"]
-                    },
-                    "tasks": data["tasks"]
-                }, f, indent=4)
-        except Exception as e:
-            logging.error(f"Erreur sauvegarde données: {e}")
-            messagebox.showerror("Erreur", f"Échec de sauvegarde: {str(e)}")
+        """ Capture l'état courant et le confie au thread d'écriture (aucune E/S sur le thread Tk). """
+        self.data_writer.submit({
+            "settings": {
+                "work_time_min": data["work_time_min"],
+                "short_break_min": data["short_break_min"],
+                "long_break_min": data["long_break_min"],
+                "pomodoros_per_cycle": data["pomodoros_per_cycle"],
+                "theme": data["theme"],
+                "auto_transition": data["auto_transition"],
+                "progress_ring": data["progress_ring"],
+                "timers": [dict(track, stats=dict(track.get("stats", {}))) for track in data["timers"]]
+            },
+            "tasks": [dict(task) for task in data["tasks"]]
+        })
+
+    def flush(self):
+        if not self.data_writer.flush():
+            logging.error("Délai dépassé lors de l'écriture de data.json")
+        if self.data_writer.last_error:
+            messagebox.showerror("Erreur", f"Échec de sauvegarde: {str(self.data_writer.last_error)}")
     
     def load_stats(self):
-        try:
-            with open(self.stats_file, "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+        """ Retourne l'index en mémoire {date: nombre}, tenu à jour par record_pomodoro/clear_stats. """
+        return self.stats_log.load()
     
-    def save_stats(self, stats):
+    def record_pomodoro(self, day):
         try:
-            with open(self.stats_file, "w") as f:
-                json.dump(stats, f, indent=4)
+            self.stats_log.record(day)
+            return True
         except Exception as e:
             logging.error(f"Erreur sauvegarde stats: {e}")
             messagebox.showerror("Erreur", f"Échec de sauvegarde stats: {str(e)}")
+            return False
+
+    def clear_stats(self):
+        try:
+            self.stats_log.clear()
+            return True
+        except Exception as e:
+            logging.error(f"Erreur sauvegarde stats: {e}")
+            messagebox.showerror("Erreur", f"Échec de sauvegarde stats: {str(e)}")
+            return False
+
+    def save_stats(self):
+        """ Compacte le journal en un instantané (appelé à la fermeture). """
+        self.stats_log.compact()
+
+class SqliteDataManager(DataManager):
+    """ Backend SQLite (mode WAL) : paramètres, tâches et stats journalières sont modifiés ligne par ligne. """
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, done INTEGER NOT NULL DEFAULT 0)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_done ON tasks (done)",
+        "CREATE TABLE IF NOT EXISTS daily_stats (day TEXT PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID",
+    )
+
+    def __init__(self, db_file=None):
+        self.db_file = db_file or get_app_data_path("pomodoro.db")
+        self.sqlite3 = lazy_import("sqlite3")
+        self.conn = self.sqlite3.connect(self.db_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            for statement in self.SCHEMA:
+                self.conn.execute(statement)
+        self.stats = {}
+
+    def _write(self, sql, params=()):
+        try:
+            with self.conn:
+                return self.conn.execute(sql, params)
+        except self.sqlite3.Error as e:
+            logging.error(f"Erreur SQLite: {e}")
+            messagebox.showerror("Erreur", f"Échec de sauvegarde: {str(e)}")
+            return None
+
+    def is_migrated(self):
+        return self.conn.execute("SELECT 1 FROM settings WHERE key = 'migrated_from_json'").fetchone() is not None
+
+    def load_data(self):
+        stored = dict(self.conn.execute("SELECT key, value FROM settings"))
+        data = {key: json.loads(stored[key]) if key in stored else default for key, default in DEFAULT_SETTINGS.items()}
+        data["tasks"] = [{'id': task_id, 'text': text, 'done': bool(done)} for task_id, text, done in self.conn.execute("SELECT id, text, done FROM tasks ORDER BY id")]
+        return data
+
+    def save_data(self, data):
+        """ Enregistre les paramètres ; les tâches sont déjà écrites par add/update/delete_task. """
+        rows = [(key, json.dumps(data[key])) for key in DEFAULT_SETTINGS]
+        try:
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", rows)
+        except self.sqlite3.Error as e:
+            logging.error(f"Erreur SQLite: {e}")
+            messagebox.showerror("Erreur", f"Échec de sauvegarde: {str(e)}")
+            return
+        for task in data["tasks"]:
+            if 'id' not in task:
+                self.add_task(task)
+
+    def add_task(self, task):
+        cursor = self._write("INSERT INTO tasks (text, done) VALUES (?, ?)", (task['text'], int(task['done'])))
+        if cursor is not None:
+            task['id'] = cursor.lastrowid
+        return True
+
+    def update_task(self, task):
+        if 'id' not in task:
+            return self.add_task(task)
+        self._write("UPDATE tasks SET text = ?, done = ? WHERE id = ?", (task['text'], int(task['done']), task['id']))
+        return True
+
+    def delete_task(self, task):
+        if 'id' in task:
+            self._write("DELETE FROM tasks WHERE id = ?", (task['id'],))
+        return True
+
+    def load_stats(self):
+        self.stats = dict(self.conn.execute("SELECT day, count FROM daily_stats"))
+        return self.stats
+
+    def record_pomodoro(self, day):
+        if self._write("INSERT INTO daily_stats (day, count) VALUES (?, 1) ON CONFLICT(day) DO UPDATE SET count = count + 1", (day,)) is None:
+            return False
+        self.stats[day] = self.stats.get(day, 0) + 1
+        return True
+
+    def clear_stats(self):
+        if self._write("DELETE FROM daily_stats") is None:
+            return False
+        self.stats.clear()
+        return True
+
+    def save_stats(self):
+        try:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        except self.sqlite3.Error as e:
+            logging.error(f"Erreur SQLite: {e}")
+
+def migrate_json_to_sqlite(json_manager, sqlite_manager):
+    """ Import unique de data.json et des stats JSON dans la base SQLite. """
+    if sqlite_manager.is_migrated():
+        return False
+    data = json_manager.load_data()
+    stats = json_manager.load_stats()
+    with sqlite_manager.conn as conn:
+        conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", [(key, json.dumps(data[key])) for key in DEFAULT_SETTINGS])
+        conn.executemany("INSERT INTO tasks (text, done) VALUES (?, ?)", [(task['text'], int(task.get('done', False))) for task in data["tasks"]])
+        conn.executemany("INSERT OR REPLACE INTO daily_stats (day, count) VALUES (?, ?)", list(stats.items()))
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('migrated_from_json', ?)", (json.dumps(str(date.today())),))
+    logging.info(f"Migration JSON -> SQLite : {len(data['tasks'])} tâches, {len(stats)} jours de stats.")
+    return True
+
+def create_data_manager():
+    """ Choisit le backend : SQLite si demandé (--sqlite) ou déjà utilisé, sinon JSON. """
+    db_file = get_app_data_path("pomodoro.db")
+    if "--sqlite" not in sys.argv and not os.path.exists(db_file):
+        return JsonDataManager()
+    manager = SqliteDataManager(db_file)
+    if not manager.is_migrated():
+        migrate_json_to_sqlite(JsonDataManager(), manager)
+    return manager
+
+class StatsRollups:
+    """ Agrégats des stats tenus à jour en O(1) par pomodoro : totaux jour/semaine/mois/année,
+        total général, séries (actuelle et record) et moyennes glissantes. """
+    def __init__(self, stats):
+        self.stats = stats
+        self.reset()
+        for day in sorted(stats):
+            try:
+                self._add(date.fromisoformat(day), stats[day])
+            except ValueError:
+                continue
+        self.sorted_days = sorted(stats)
+
+    def reset(self):
+        self.weekly, self.monthly, self.yearly = {}, {}, {}
+        self.total = 0
+        self.streak_end = None
+        self.streak = 0
+        self.longest_streak = 0
+        self.sorted_days = []
+
+    def _add(self, day, count):
+        self.total += count
+        iso_year, iso_week, _ = day.isocalendar()
+        week_key = f"{iso_year}-S{iso_week:02d}"
+        month_key, year_key = day.strftime("%Y-%m"), str(day.year)
+        self.weekly[week_key] = self.weekly.get(week_key, 0) + count
+        self.monthly[month_key] = self.monthly.get(month_key, 0) + count
+        self.yearly[year_key] = self.yearly.get(year_key, 0) + count
+        if self.streak_end is None or (day - self.streak_end).days > 1:
+            self.streak, self.streak_end = 1, day
+        elif (day - self.streak_end).days == 1:
+            self.streak, self.streak_end = self.streak + 1, day
+        self.longest_streak = max(self.longest_streak, self.streak)
+
+    def add(self, day_str, count=1):
+        """ À appeler après la mise à jour de stats[day_str]. """
+        if self.stats.get(day_str, 0) == count:
+            # Nouveau jour : presque toujours le plus récent, donc ajouté en fin de liste
+            if not self.sorted_days or day_str > self.sorted_days[-1]:
+                self.sorted_days.append(day_str)
+            else:
+                bisect.insort(self.sorted_days, day_str)
+        self._add(date.fromisoformat(day_str), count)
+
+    def days_page(self, offset, size):
+        """ Une page de jours, du plus récent au plus ancien. """
+        end = len(self.sorted_days) - offset
+        return self.sorted_days[max(0, end - size):max(0, end)][::-1]
+
+    def current_streak(self, today=None):
+        today = today or date.today()
+        if self.streak_end is None or (today - self.streak_end).days > 1:
+            return 0
+        return self.streak
+
+    def rolling_average(self, days, today=None):
+        today = today or date.today()
+        return sum(self.stats.get(str(date.fromordinal(today.toordinal() - i)), 0) for i in range(days)) / days
+
+    def summary(self, today=None):
+        today = today or date.today()
+        iso_year, iso_week, _ = today.isocalendar()
+        return {
+            "today": self.stats.get(str(today), 0),
+            "week": self.weekly.get(f"{iso_year}-S{iso_week:02d}", 0),
+            "month": self.monthly.get(today.strftime("%Y-%m"), 0),
+            "year": self.yearly.get(str(today.year), 0),
+            "total": self.total,
+            "streak": self.current_streak(today),
+            "longest_streak": self.longest_streak,
+            "avg_7": self.rolling_average(7, today),
+            "avg_30": self.rolling_average(30, today),
+        }
+
+# --- Historique détaillé des sessions (stockage en colonnes) ---
+class SessionRecordStore:
+    """ Une session terminée = un enregistrement de largeur fixe (27 octets), réparti dans un fichier
+        par colonne. Chaque fichier se relit d'un bloc avec array.fromfile ou numpy.fromfile. """
+    COLUMNS = {
+        "start": "d",     # début (horodatage mural)
+        "end": "d",       # fin (horodatage mural)
+        "planned": "I",   # durée prévue (s)
+        "actual": "I",    # durée réellement décomptée (s)
+        "type": "B",      # code du type de session
+        "flags": "B",     # FLAG_*
+        "pauses": "B",    # nombre de pauses (plafonné à 255)
+    }
+    TYPES = {"work": 1, "short_break": 2, "long_break": 3}
+    FLAG_SKIPPED, FLAG_COMPLETED, FLAG_RESUMED = 1, 2, 4
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.current = None
+        # Agrégats tenus à jour par end() ; None tant que la lecture initiale n'est pas terminée
+        self._aggregates = None
+        # Enregistrements ajoutés pendant la lecture initiale, repris à sa fin
+        self._pending = []
+        self._generation = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._repair()
+
+    def load_aggregates_async(self):
+        threading.Thread(target=self.load_aggregates, daemon=True).start()
+
+    def load_aggregates(self):
+        """ Calcule les agrégats en une seule lecture des colonnes, hors du thread Tk. """
+        with self._lock:
+            generation, count = self._generation, self.count
+            self._pending = []
+        try:
+            aggregates = self._scan(count)
+        except OSError as e:
+            logging.error(f"Erreur de lecture des sessions: {e}")
+            aggregates = self._empty_aggregates()
+        with self._lock:
+            if generation != self._generation:
+                return
+            for record in self._pending:
+                self._accumulate(aggregates, record)
+            self._pending = []
+            self._aggregates = aggregates
+
+    @property
+    def ready(self):
+        return self._aggregates is not None
+
+    def _path(self, column):
+        return os.path.join(self.directory, f"{column}.{self.COLUMNS[column]}")
+
+    def _repair(self):
+        # Un crash pendant un ajout peut laisser des colonnes de longueurs différentes
+        byte_sizes = {}
+        for column in self.COLUMNS:
+            try:
+                byte_sizes[column] = os.path.getsize(self._path(column))
+            except OSError:
+                byte_sizes[column] = 0
+        count = min(size // array(self.COLUMNS[column]).itemsize for column, size in byte_sizes.items())
+        for column, size in byte_sizes.items():
+            expected = count * array(self.COLUMNS[column]).itemsize
+            if size != expected or not os.path.exists(self._path(column)):
+                with open(self._path(column), "ab") as f:
+                    f.truncate(expected)
+        self.count = count
+
+    def begin(self, session_type, planned, elapsed=0.0, resumed=False):
+        """ Ouvre la session courante ; elapsed sert à dater une session reprise après un arrêt. """
+        self.current = {"type": session_type, "start": time.time() - elapsed, "planned": planned,
+                        "pauses": 0, "resumed": resumed}
+
+    def note_pause(self):
+        if self.current is not None:
+            self.current["pauses"] += 1
+
+    def discard(self):
+        self.current = None
+
+    def end(self, actual, skipped=False):
+        """ Ferme la session courante et ajoute son enregistrement à chaque colonne. """
+        session, self.current = self.current, None
+        if session is None or session["type"] not in self.TYPES:
+            return
+        flags = (self.FLAG_SKIPPED if skipped else self.FLAG_COMPLETED) | (self.FLAG_RESUMED if session["resumed"] else 0)
+        record = {
+            "start": session["start"],
+            "end": time.time(),
+            "planned": int(session["planned"]),
+            "actual": int(round(max(0.0, actual))),
+            "type": self.TYPES[session["type"]],
+            "flags": flags,
+            "pauses": min(session["pauses"], 255),
+        }
+        try:
+            for column, typecode in self.COLUMNS.items():
+                with open(self._path(column), "ab") as f:
+                    array(typecode, [record[column]]).tofile(f)
+        except OSError as e:
+            logging.error(f"Erreur d'enregistrement de la session: {e}")
+            self._repair()
+            return
+        with self._lock:
+            self.count += 1
+            if self._aggregates is None:
+                self._pending.append(record)
+            else:
+                self._accumulate(self._aggregates, record)
+
+    def clear(self):
+        self.current = None
+        for column in self.COLUMNS:
+            with open(self._path(column), "wb"):
+                pass
+        with self._lock:
+            self.count = 0
+            self._generation += 1
+            self._pending = []
+            self._aggregates = self._empty_aggregates()
+
+    def columns(self, count):
+        """ Charge les count premiers enregistrements de chaque colonne (tableaux numpy si disponible, sinon array). """
+        try:
+            numpy = lazy_import("numpy")
+        except ImportError:
+            numpy = None
+        columns = {}
+        for column, typecode in self.COLUMNS.items():
+            if numpy is not None:
+                columns[column] = numpy.fromfile(self._path(column), dtype=typecode, count=count)
+            else:
+                values = array(typecode)
+                with open(self._path(column), "rb") as f:
+                    values.fromfile(f, count)
+                columns[column] = values
+        return numpy, columns
+
+    def _empty_aggregates(self):
+        return {
+            "hours": [0] * 24,  # sessions de travail terminées par heure locale de début
+            "total": {code: 0 for code in self.TYPES.values()},
+            "skipped": {code: 0 for code in self.TYPES.values()},
+            "planned": 0,  # travail prévu (s)
+            "actual": 0,   # travail réellement décompté (s)
+        }
+
+    def _accumulate(self, aggregates, record):
+        code = record["type"]
+        aggregates["total"][code] += 1
+        if record["flags"] & self.FLAG_SKIPPED:
+            aggregates["skipped"][code] += 1
+        if code == self.TYPES["work"]:
+            aggregates["planned"] += record["planned"]
+            aggregates["actual"] += record["actual"]
+            if record["flags"] & self.FLAG_COMPLETED:
+                # Décalage UTC courant (l'heure d'été des sessions anciennes est ignorée)
+                offset = time.localtime().tm_gmtoff
+                aggregates["hours"][int((record["start"] + offset) // 3600 % 24)] += 1
+
+    def _scan(self, count):
+        aggregates = self._empty_aggregates()
+        if not count:
+            return aggregates
+        numpy, columns = self.columns(count)
+        work = self.TYPES["work"]
+        offset = time.localtime().tm_gmtoff
+        if numpy is not None:
+            types, flags = columns["type"], columns["flags"]
+            for code in self.TYPES.values():
+                mask = types == code
+                aggregates["total"][code] = int(mask.sum())
+                aggregates["skipped"][code] = int(((flags[mask] & self.FLAG_SKIPPED) != 0).sum())
+            mask = types == work
+            aggregates["planned"] = int(columns["planned"][mask].sum(dtype=numpy.int64))
+            aggregates["actual"] = int(columns["actual"][mask].sum(dtype=numpy.int64))
+            mask &= (flags & self.FLAG_COMPLETED) != 0
+            hours = ((columns["start"][mask] + offset) // 3600 % 24).astype(numpy.int64)
+            aggregates["hours"] = numpy.bincount(hours, minlength=24).tolist()
+            return aggregates
+        for start, type_code, flags, planned, actual in zip(columns["start"], columns["type"], columns["flags"],
+                                                             columns["planned"], columns["actual"]):
+            aggregates["total"][type_code] = aggregates["total"].get(type_code, 0) + 1
+            if flags & self.FLAG_SKIPPED:
+                aggregates["skipped"][type_code] = aggregates["skipped"].get(type_code, 0) + 1
+            if type_code == work:
+                aggregates["planned"] += planned
+                aggregates["actual"] += actual
+                if flags & self.FLAG_COMPLETED:
+                    aggregates["hours"][int((start + offset) // 3600 % 24)] += 1
+        return aggregates
+
+    def hour_histogram(self):
+        """ Nombre de sessions de travail terminées (non passées) par heure locale de début. """
+        with self._lock:
+            return list(self._aggregates["hours"])
+
+    def skip_rates(self):
+        """ Proportion de sessions passées, par type de session. """
+        with self._lock:
+            total, skipped = self._aggregates["total"], self._aggregates["skipped"]
+            return {session_type: skipped[code] / total[code] if total[code] else 0.0
+                    for session_type, code in self.TYPES.items()}
+
+    def focus_ratio(self):
+        """ Temps de travail réellement décompté / temps de travail prévu. """
+        with self._lock:
+            planned, actual = self._aggregates["planned"], self._aggregates["actual"]
+        return actual / planned if planned else 0.0
 
 # --- Classes pour la logique du minuteur ---
+def session_clock():
+    """ Horloge monotone qui avance aussi pendant la mise en veille : time.monotonic s'arrête pendant
+        la veille sous Linux et macOS, ce qui rallongerait la session de la durée de la veille. """
+    return time.clock_gettime(_SESSION_CLOCK_ID)
+
+if hasattr(time, "CLOCK_BOOTTIME"):
+    _SESSION_CLOCK_ID = time.CLOCK_BOOTTIME
+elif sys.platform == "darwin":
+    # Sous macOS, CLOCK_MONOTONIC (mach_continuous_time) inclut le temps de veille
+    _SESSION_CLOCK_ID = time.CLOCK_MONOTONIC
+else:
+    # Windows : time.monotonic (QueryPerformanceCounter) continue pendant la veille
+    session_clock = time.monotonic
+
 class TimerLogic:
-    def __init__(self, work_time_min, short_break_min, long_break_min, pomodoros_per_cycle):
+    """ Minuteur basé sur une échéance absolue (horloge monotone, veille comprise) : aucune dérive
+        si un rappel Tk est en retard ni après une mise en veille. """
+    # Marge ajoutée au réveil pour tomber juste après le changement de seconde
+    TICK_MARGIN_SEC = 0.005
+
+    def __init__(self, work_time_min, short_break_min, long_break_min, pomodoros_per_cycle, clock=session_clock):
         self.work_time_sec = work_time_min * 60
         self.short_break_time_sec = short_break_min * 60
         self.long_break_time_sec = long_break_min * 60
         self.pomodoros_per_cycle = pomodoros_per_cycle
+        self.clock = clock
         self.reset()
     
     def reset(self):
-        self.current_time_sec = self.work_time_sec
+        self._deadline = None
+        self._remaining = float(self.work_time_sec)
         self.pomodoro_count = 0
         self.is_running = False
         self.is_paused = False
         self.last_state = "stopped"
+        self.warning_played = False
+
+    def session_duration(self, session_type):
+        if session_type == "short_break":
+            return self.short_break_time_sec
+        if session_type == "long_break":
+            return self.long_break_time_sec
+        return self.work_time_sec
+
+    @property
+    def remaining(self):
+        """ Temps restant exact en secondes (float), recalculé depuis l'échéance. """
+        if self._deadline is None:
+            return self._remaining
+        return max(0.0, self._deadline - self.clock())
+
+    @property
+    def current_time_sec(self):
+        return int(math.ceil(self.remaining))
+
+    @current_time_sec.setter
+    def current_time_sec(self, value):
+        self._remaining = float(value)
+        if self._deadline is not None:
+            self._deadline = self.clock() + self._remaining
     
-    def start_session(self, session_type):
+    def start_session(self, session_type, remaining=None):
         self.last_state = session_type
         self.is_running = True
         self.is_paused = False
-        
-        if session_type == "work":
-            self.current_time_sec = self.work_time_sec
-        elif session_type == "short_break":
-            self.current_time_sec = self.short_break_time_sec
-        elif session_type == "long_break":
-            self.current_time_sec = self.long_break_time_sec
+        self.warning_played = False
+        self._remaining = float(self.session_duration(session_type) if remaining is None else remaining)
+        self._deadline = self.clock() + self._remaining
+
+    def prepare_session(self, session_type):
+        """ Prépare une session en attente (en pause) sans démarrer le décompte. """
+        self.last_state = session_type
+        self.is_running = True
+        self.is_paused = True
+        self.warning_played = False
+        self._deadline = None
+        self._remaining = float(self.session_duration(session_type))
+
+    def stop(self):
+        self._remaining = self.remaining
+        self._deadline = None
+        self.is_running = False
     
     def pause(self):
         if self.is_running and not self.is_paused:
+            self._remaining = self.remaining
+            self._deadline = None
             self.is_paused = True
     
     def resume(self):
         if self.is_running and self.is_paused:
+            self._deadline = self.clock() + self._remaining
             self.is_paused = False
-    
-    def tick(self):
-        if self.is_running and not self.is_paused and self.current_time_sec > 0:
-            self.current_time_sec -= 1
+
+    def is_counting(self):
+        return self.is_running and not self.is_paused
+
+    def is_expired(self):
+        return self.is_counting() and self.remaining <= 0
+
+    def seconds_until_next_tick(self):
+        """ Délai jusqu'au prochain changement de seconde affichée (aligné sur l'échéance). """
+        remaining = self.remaining
+        if remaining <= 0:
+            return 0.0
+        fraction = remaining - math.floor(remaining)
+        return (fraction if fraction > 0 else 1.0) + self.TICK_MARGIN_SEC
+
+    def seconds_until_next_minute_change(self):
+        """ Délai jusqu'au prochain changement visible quand seules les minutes sont affichées :
+            changement de minute, ou passage à 60 s (avertissement, puis affichage des secondes). """
+        remaining = self.remaining
+        shown = int(math.ceil(remaining))
+        if shown <= 60:
+            return self.seconds_until_next_tick()
+        next_change = max((shown // 60) * 60 - 1, 60)
+        return remaining - next_change + self.TICK_MARGIN_SEC
+
+    def consume_warning(self):
+        """ Vrai une seule fois par session de travail quand il reste une minute ou moins. """
+        if self.warning_played or self.last_state != "work" or not self.is_counting():
+            return False
+        if 0 < self.current_time_sec <= 60:
+            self.warning_played = True
             return True
         return False
     
@@ -205,8 +1105,1401 @@ class TimerLogic:
                 self.pomodoro_count = 0
             return 'work'
 
+# --- Diagnostics (retards de la boucle Tk, latences, caches) ---
+class DiagnosticsMonitor:
+    """ Toujours actif : chaque mesure coûte un bisect. Compare l'heure prévue et l'heure réelle
+        des rappels du minuteur, l'attente dans la file de commandes Tk et la latence de l'icône.
+        Un instantané est écrit (hors thread Tk, sans fsync) dans diagnostics.json au plus une fois
+        par SNAPSHOT_INTERVAL_SEC, lors d'un réveil déjà prévu du minuteur, et à la fermeture. """
+    SNAPSHOT_INTERVAL_SEC = 60.0
+
+    def __init__(self, snapshot_file):
+        self.histograms = SpanTracer(enabled=True, slow_ms=None)
+        self.writer = WriteBehindWriter(snapshot_file, sync=False)
+        self.started = time.monotonic()
+        self.last_snapshot = self.started
+        self._expected = None
+
+    def expect(self, delay_sec):
+        """ Note l'heure à laquelle le prochain rappel du minuteur devrait s'exécuter. """
+        self._expected = time.monotonic() + delay_sec
+
+    def cancel(self):
+        self._expected = None
+
+    def tick_fired(self):
+        if self._expected is not None:
+            self.record("minuteur.retard", (time.monotonic() - self._expected) * 1000)
+            self._expected = None
+
+    def record(self, name, duration_ms):
+        self.histograms.add(name, max(0.0, duration_ms))
+
+    def latencies(self):
+        histograms = self.histograms
+        with histograms._lock:
+            names = sorted(histograms.histograms)
+        summary = {}
+        for name in names:
+            histogram = histograms.histograms[name]
+            summary[name] = {"n": histogram["n"], "moy_ms": round(histogram["total"] / histogram["n"], 3),
+                             "p95_ms": histograms.percentile(name, 0.95), "max_ms": round(histogram["max"], 3)}
+        return summary
+
+    def snapshot(self, counters):
+        return {
+            "horodatage": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "duree_s": round(time.monotonic() - self.started),
+            "latences": self.latencies(),
+            "compteurs": counters,
+        }
+
+    def snapshot_due(self):
+        return time.monotonic() - self.last_snapshot >= self.SNAPSHOT_INTERVAL_SEC
+
+    def write_snapshot(self, counters):
+        self.last_snapshot = time.monotonic()
+        self.writer.submit(self.snapshot(counters))
+
+# --- Point de reprise de la session en cours ---
+class SessionCheckpoint:
+    """ Enregistrement binaire de taille fixe, réécrit sur place via mmap à chaque tick (quelques
+        octets, aucun JSON). Permet de reprendre la session après un crash ou un redémarrage. """
+    MAGIC = b"FPCK"
+    # magic, version, état, drapeaux, compteur de pomodoros, restant (s), heure murale, crc32
+    RECORD = struct.Struct("<4sBBBxIddI")
+    STATES = ("stopped", "work", "short_break", "long_break")
+    FLAG_RUNNING, FLAG_PAUSED, FLAG_WARNING = 1, 2, 4
+
+    def __init__(self, path):
+        self.path = path
+        self.map = None
+        self.writes = 0
+
+    def _open(self):
+        if self.map is None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size != self.RECORD.size:
+                    os.ftruncate(fd, self.RECORD.size)
+                self.map = mmap.mmap(fd, self.RECORD.size)
+            finally:
+                os.close(fd)
+        return self.map
+
+    def write(self, timer, sync=False, paused=None):
+        """ paused force l'état pause enregistré (fermeture volontaire : reprise sans décompte). """
+        state = timer.last_state if timer.is_running else "stopped"
+        is_paused = timer.is_paused if paused is None else paused
+        flags = ((self.FLAG_RUNNING if timer.is_running else 0) | (self.FLAG_PAUSED if is_paused else 0)
+                 | (self.FLAG_WARNING if timer.warning_played else 0))
+        fields = (self.MAGIC, 1, self.STATES.index(state) if state in self.STATES else 0, flags,
+                  timer.pomodoro_count, timer.remaining, time.time())
+        payload = self.RECORD.pack(*fields, 0)[:-4]
+        try:
+            record = self._open()
+            self.RECORD.pack_into(record, 0, *fields, zlib.crc32(payload))
+            if sync:
+                record.flush()
+            self.writes += 1
+        except (OSError, ValueError) as e:
+            logging.warning(f"Écriture du point de reprise impossible: {e}")
+
+    def read(self):
+        """ Retourne la session enregistrée, ou None si absente, arrêtée ou corrompue. """
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read(self.RECORD.size)
+        except OSError:
+            return None
+        if len(raw) != self.RECORD.size:
+            return None
+        magic, version, state_code, flags, pomodoro_count, remaining, saved_at, crc = self.RECORD.unpack(raw)
+        if magic != self.MAGIC or version != 1 or crc != zlib.crc32(raw[:-4]) or state_code >= len(self.STATES):
+            return None
+        if state_code == 0 or not flags & self.FLAG_RUNNING:
+            return None
+        return {
+            "state": self.STATES[state_code],
+            "paused": bool(flags & self.FLAG_PAUSED),
+            "warning_played": bool(flags & self.FLAG_WARNING),
+            "pomodoro_count": pomodoro_count,
+            "remaining": remaining,
+            "saved_at": saved_at,
+        }
+
+    def close(self):
+        if self.map is not None:
+            self.map.flush()
+            self.map.close()
+            self.map = None
+
+# --- Moteur de sessions (sans Tk) ---
+class SessionEngine:
+    """ Machine à états des sessions travail/pause, indépendante de Tk. L'interface l'appelle
+        et se contente d'afficher le résultat ; l'horloge est celle du TimerLogic (injectable). """
+    def __init__(self, timer, auto_transition=True, on_pomodoro_completed=None, on_transition=None):
+        self.timer = timer
+        self.auto_transition = auto_transition
+        self.on_pomodoro_completed = on_pomodoro_completed
+        self.on_transition = on_transition
+        self.transitions = 0
+
+    def first_session_type(self):
+        return 'work' if self.timer.last_state in ['stopped', 'short_break', 'long_break'] else self.timer.last_state
+
+    def start(self, session_type, remaining=None):
+        self.timer.start_session(session_type, remaining)
+
+    def prepare(self, session_type):
+        self.timer.prepare_session(session_type)
+
+    def enter(self, session_type):
+        """ Entre dans la session suivante : démarrée (transition auto) ou en attente. """
+        if self.auto_transition:
+            self.start(session_type)
+        else:
+            self.prepare(session_type)
+
+    def pause(self):
+        self.timer.pause()
+
+    def resume(self):
+        self.timer.resume()
+
+    def end_session(self, skipped=False):
+        """ Termine la session en cours (naturellement ou passée) et retourne le type de la suivante. """
+        ended = self.timer.last_state
+        self.timer.stop()
+        if ended == 'work':
+            self.timer.pomodoro_count += 1
+            if self.on_pomodoro_completed:
+                self.on_pomodoro_completed()
+        next_state = self.timer.determine_next_session_type()
+        self.transitions += 1
+        if self.on_transition:
+            self.on_transition(ended, next_state, skipped)
+        return next_state
+
+class SimulatedClock:
+    """ Horloge manuelle pour piloter TimerLogic/SessionEngine sans attendre. """
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+def _simulate_sessions(engine, clock, rng, cycles, pause_rate, skip_rate):
+    """ Enchaîne `cycles` transitions et retourne le nombre d'écarts avec un modèle de référence. """
+    pomodoros_per_cycle = engine.timer.pomodoros_per_cycle
+    expected_state, expected_count, errors = engine.timer.last_state, engine.timer.pomodoro_count, 0
+    for _ in range(cycles):
+        timer = engine.timer
+        if rng.random() < pause_rate:
+            clock.advance(timer.remaining / 2)
+            engine.pause()
+            clock.advance(30.0)
+            engine.resume()
+        skipped = rng.random() < skip_rate
+        if not skipped:
+            clock.advance(timer.remaining)
+            if not timer.is_expired():
+                errors += 1
+        next_state = engine.end_session(skipped=skipped)
+        if expected_state == 'work':
+            expected_count += 1
+            expected_next = 'long_break' if expected_count % pomodoros_per_cycle == 0 else 'short_break'
+        else:
+            if expected_state == 'long_break':
+                expected_count = 0
+            expected_next = 'work'
+        if next_state != expected_next:
+            errors += 1
+        expected_state = next_state
+        engine.enter(next_state)
+        if timer.current_time_sec != timer.session_duration(next_state):
+            errors += 1
+    return errors
+
+def run_engine_benchmark(cycles=1_000_000, pomodoros_per_cycle=4, seed=1):
+    """ Simule des cycles complets (fins normales, pauses/reprises, sauts) et mesure le coût par
+        transition, les allocations et la justesse des transitions. """
+    import random
+    import tracemalloc
+    scenarios = {"cycles": (0.0, 0.0), "pause_resume": (0.5, 0.0), "mixte": (0.3, 0.2)}
+    results = {}
+    for name, (pause_rate, skip_rate) in scenarios.items():
+        rng = random.Random(seed)
+        clock = SimulatedClock()
+        engine = SessionEngine(TimerLogic(25, 5, 15, pomodoros_per_cycle, clock=clock))
+        engine.start('work')
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter()
+        errors = _simulate_sessions(engine, clock, rng, cycles, pause_rate, skip_rate)
+        elapsed = time.perf_counter() - start
+        blocks_after = sys.getallocatedblocks()
+        # Passe courte séparée sous tracemalloc (trop lent pour la passe chronométrée)
+        tracemalloc.start()
+        errors += _simulate_sessions(engine, clock, rng, min(cycles, 10_000), pause_rate, skip_rate)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            "transitions": engine.transitions,
+            "ns_par_transition": elapsed * 1e9 / max(1, cycles),
+            "blocs_alloues_nets": blocks_after - blocks_before,
+            "pic_memoire_octets": peak,
+            "erreurs": errors,
+        }
+    return results
+
+# --- Minuteurs parallèles ---
+class DeadlineHeap:
+    """ File de priorité d'échéances par clé ; une nouvelle échéance remplace l'ancienne (suppression paresseuse). """
+    def __init__(self):
+        self.heap = []
+        self.versions = {}
+        self.seq = 0
+
+    def schedule(self, key, due):
+        self.seq += 1
+        self.versions[key] = self.seq
+        heapq.heappush(self.heap, (due, self.seq, key))
+
+    def cancel(self, key):
+        self.versions.pop(key, None)
+
+    def _drop_stale(self):
+        while self.heap and self.versions.get(self.heap[0][2]) != self.heap[0][1]:
+            heapq.heappop(self.heap)
+
+    def next_due(self):
+        self._drop_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now):
+        due_keys = []
+        self._drop_stale()
+        while self.heap and self.heap[0][0] <= now:
+            _, _, key = heapq.heappop(self.heap)
+            del self.versions[key]
+            due_keys.append(key)
+            self._drop_stale()
+        return due_keys
+
+class MultiTimerEngine:
+    """ N minuteurs nommés (réglages et cycles indépendants) pilotés par un seul tas d'échéances :
+        l'interface n'a besoin que d'un rappel, armé sur l'échéance la plus proche. """
+    def __init__(self, clock=session_clock, on_pomodoro_completed=None, on_session_end=None):
+        self.clock = clock
+        self.on_pomodoro_completed = on_pomodoro_completed
+        self.on_session_end = on_session_end
+        self.engines = {}
+        self.deadlines = DeadlineHeap()
+
+    def add_timer(self, name, work_time_min, short_break_min, long_break_min, pomodoros_per_cycle, auto_transition=True):
+        timer = TimerLogic(work_time_min, short_break_min, long_break_min, pomodoros_per_cycle, clock=self.clock)
+        on_completed = (lambda: self.on_pomodoro_completed(name)) if self.on_pomodoro_completed else None
+        self.engines[name] = SessionEngine(timer, auto_transition, on_pomodoro_completed=on_completed)
+        return self.engines[name]
+
+    def remove_timer(self, name):
+        self.engines.pop(name, None)
+        self.deadlines.cancel(name)
+
+    def _reschedule(self, name):
+        timer = self.engines[name].timer
+        if timer.is_counting():
+            self.deadlines.schedule(name, self.clock() + timer.remaining)
+        else:
+            self.deadlines.cancel(name)
+
+    def start(self, name):
+        engine = self.engines[name]
+        engine.start(engine.first_session_type())
+        self._reschedule(name)
+
+    def toggle(self, name):
+        """ Démarre, met en pause ou reprend, comme le bouton principal. """
+        timer = self.engines[name].timer
+        if timer.is_paused:
+            self.engines[name].resume()
+        elif timer.is_running:
+            self.engines[name].pause()
+        else:
+            self.engines[name].start(self.engines[name].first_session_type())
+        self._reschedule(name)
+
+    def skip(self, name):
+        engine = self.engines[name]
+        ended = engine.timer.last_state
+        next_state = engine.end_session(skipped=True)
+        engine.enter(next_state)
+        self._reschedule(name)
+        return ended, next_state
+
+    def seconds_until_next_deadline(self):
+        due = self.deadlines.next_due()
+        return None if due is None else max(0.0, due - self.clock())
+
+    def process_due(self):
+        """ Termine toutes les sessions échues et enchaîne sur les suivantes. """
+        transitions = []
+        for name in self.deadlines.pop_due(self.clock()):
+            engine = self.engines.get(name)
+            if engine is None:
+                continue
+            if not engine.timer.is_expired():
+                self._reschedule(name)
+                continue
+            ended = engine.timer.last_state
+            next_state = engine.end_session()
+            engine.enter(next_state)
+            self._reschedule(name)
+            transitions.append((name, ended, next_state))
+            if self.on_session_end:
+                self.on_session_end(name, ended, next_state)
+        return transitions
+
+# --- Rendu des icônes de la barre des tâches ---
+class TrayIconRenderer:
+    """ Atlas des images de l'icône : police chargée une fois, images 00-60 pré-rendues par couleur,
+        conservées dans un cache LRU borné. """
+    SIZE = 64
+    FRAME_TEXTS = [""] + [f"{n:02d}" for n in range(61)]
+    FONT_CANDIDATES = ("arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf")
+
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self._font = None
+
+    @property
+    def font(self):
+        if self._font is None:
+            for candidate in self.FONT_CANDIDATES:
+                try:
+                    self._font = lazy_import("PIL.ImageFont").truetype(candidate, 48)
+                    break
+                except IOError:
+                    continue
+            else:
+                self._font = lazy_import("PIL.ImageFont").load_default()
+        return self._font
+
+    @traced("tray.render")
+    def render(self, color_name, time_text):
+        image = lazy_import("PIL.Image").new('RGB', (self.SIZE, self.SIZE), color_name)
+        draw = lazy_import("PIL.ImageDraw").Draw(image)
+        bbox = draw.textbbox((0, 0), time_text, font=self.font)
+        text_width = bbox[2] - bbox[0]; text_height = bbox[3] - bbox[1]
+        position = ((self.SIZE - text_width) / 2, (self.SIZE - text_height) / 2 - bbox[1])
+        draw.text(position, time_text, font=self.font, fill="white")
+        return image
+
+    def get(self, color_name, time_text):
+        key = (color_name, time_text)
+        with self._lock:
+            image = self._frames.get(key)
+            if image is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+        image = self.render(color_name, time_text)
+        self._store(key, image)
+        return image
+
+    def _store(self, key, image):
+        with self._lock:
+            self._frames[key] = image
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.capacity:
+                self._frames.popitem(last=False)
+
+    def prerender(self, colors):
+        for color_name in colors:
+            for time_text in self.FRAME_TEXTS:
+                with self._lock:
+                    if (color_name, time_text) in self._frames:
+                        continue
+                self._store((color_name, time_text), self.render(color_name, time_text))
+
+    def prerender_async(self, colors):
+        threading.Thread(target=self.prerender, args=(list(colors),), daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            return {"frames": len(self._frames), "hits": self.hits, "misses": self.misses}
+
+    def benchmark(self, frames=1000, color_name="#DB4437"):
+        """ Micro-benchmark : nombre d'images rendues par seconde (sans cache). """
+        self.font
+        start = time.perf_counter()
+        for i in range(frames):
+            self.render(color_name, self.FRAME_TEXTS[i % len(self.FRAME_TEXTS)])
+        elapsed = time.perf_counter() - start
+        return frames / elapsed if elapsed > 0 else float("inf")
+
+# --- Icône de la barre des tâches ---
+class UiCommandQueue:
+    """ File thread-safe des commandes destinées au thread Tk (menu de l'icône, etc.).
+        Les producteurs ne font que queue.put : seul le thread Tk arme le rappel qui vide la file,
+        rapproché tant que des commandes arrivent, espacé quand elle reste vide. """
+    BUSY_POLL_MS = 20
+    IDLE_POLL_MS = 200
+    # Fenêtre masquée : les commandes viennent du menu de l'icône ou de l'API locale
+    HIDDEN_POLL_MS = 1000
+
+    def __init__(self, app, monitor=None):
+        self.app = app
+        self.monitor = monitor
+        self.queue = queue.Queue()
+        self.polls = 0
+        self._drain_job = None
+        self._stopped = False
+
+    def post(self, command, *args):
+        self.queue.put((command, args, time.monotonic()))
+
+    def start(self):
+        """ À appeler depuis le thread Tk. """
+        if self._drain_job is None:
+            self._drain_job = self.app.after(self.BUSY_POLL_MS, self.drain)
+
+    def stop(self):
+        self._stopped = True
+        if self._drain_job is not None:
+            self.app.after_cancel(self._drain_job)
+            self._drain_job = None
+
+    def drain(self):
+        self._drain_job = None
+        self.polls += 1
+        handled = False
+        while True:
+            try:
+                command, args, posted_at = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            handled = True
+            if self.monitor:
+                self.monitor.record("file_tk.attente", (time.monotonic() - posted_at) * 1000)
+            try:
+                getattr(self.app, command)(*args)
+            except Exception as e:
+                logging.error(f"Erreur commande '{command}': {e}")
+            if self._stopped:
+                # quit_app a arrêté la file
+                return
+        if handled:
+            delay = self.BUSY_POLL_MS
+        elif self.app.hiding_to_tray:
+            delay = self.HIDDEN_POLL_MS
+        else:
+            delay = self.IDLE_POLL_MS
+        self._drain_job = self.app.after(delay, self.drain)
+
+class TrayController:
+    """ Une seule icône pystray et un seul thread pour toute la durée du processus ; l'icône est
+        affichée ou masquée. Les mises à jour passent par un canal « dernière valeur gagnante ». """
+    def __init__(self, pystray, initial_image, commands, monitor=None):
+        self.monitor = monitor
+        self.visible = False
+        self.applied = 0
+        self.superseded = 0
+        self._pending = {}
+        self._pending_since = None
+        self._applied = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        menu = (pystray.MenuItem('Afficher', lambda: commands.post("show_window"), default=True),
+                pystray.MenuItem('Afficher les tâches', lambda: commands.post("show_and_open_tasks")),
+                pystray.MenuItem('Passer', lambda: commands.post("skip_button_click")),
+                pystray.MenuItem('Quitter', lambda: commands.post("quit_app")))
+        self.icon = pystray.Icon("Focus Pomodoro", initial_image, "Focus Pomodoro", menu)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            self.icon.run(setup=self._apply_loop)
+        except Exception as e: 
+            logging.error(f"Erreur création icône barre des tâches: {e}")
+
+    def _submit(self, **values):
+        with self._lock:
+            self.superseded += sum(1 for key in values if key in self._pending)
+            self._pending.update(values)
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+        self._wake.set()
+
+    def update(self, image, title):
+        self._submit(icon=image, title=title)
+
+    def show(self):
+        self.visible = True
+        self._submit(visible=True)
+
+    def hide(self):
+        self.visible = False
+        self._submit(visible=False)
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        try:
+            self.icon.stop()
+        except Exception as e:
+            logging.error(f"Erreur arrêt icône barre des tâches: {e}")
+
+    def _apply_loop(self, icon):
+        """ Applique, sur le thread de l'icône, seulement la valeur la plus récente de chaque propriété. """
+        while not self._stopping:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                since, self._pending_since = self._pending_since, None
+            for key, value in pending.items():
+                if self._applied.get(key) is value or self._applied.get(key) == value:
+                    continue
+                try:
+                    setattr(icon, key, value)
+                except Exception as e:
+                    logging.error(f"Erreur mise à jour icône ({key}): {e}")
+                    continue
+                self._applied[key] = value
+                self.applied += 1
+            if self.monitor and since is not None and pending:
+                self.monitor.record("icone.latence", (time.monotonic() - since) * 1000)
+
+# --- API locale de contrôle ---
+class ControlServer:
+    """ Serveur asyncio local (socket Unix, ou boucle locale TCP sous Windows) sur son propre thread.
+        Protocole ligne par ligne : une commande texte par ligne, réponses et événements en JSON.
+        Les commandes passent par la UiCommandQueue ; chaque abonné a sa propre file bornée,
+        donc un client lent ne retarde jamais le thread Tk. La première ligne doit être
+        « auth <jeton> », le jeton aléatoire étant écrit dans control.token (lisible par l'utilisateur
+        seul) : un autre processus local, ou une requête HTTP d'un navigateur, est refusé. """
+    COMMANDS = {
+        "start": "remote_start", "pause": "pause_timer", "resume": "resume_timer",
+        "skip": "skip_button_click", "reset": "reset_button_click", "add_task": "add_task_from_text",
+        "show": "show_window",
+    }
+    SUBSCRIBER_QUEUE_SIZE = 64
+
+    def __init__(self, commands):
+        self.commands = commands
+        self.loop = None
+        self.server = None
+        self.subscribers = set()
+        self.subscriber_count = 0
+        self.dropped_events = 0
+        self.status = {"state": "stopped", "remaining": 0, "running": False, "paused": False, "pomodoro_count": 0, "at": time.monotonic()}
+        self.socket_path = get_app_data_path("control.sock")
+        self.port_file = get_app_data_path("control.port")
+        self.token_file = get_app_data_path("control.token")
+        self.token = secrets.token_hex(32)
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        asyncio = lazy_import("asyncio")
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._serve())
+            self.loop.run_forever()
+        except Exception as e:
+            logging.error(f"Erreur serveur de contrôle: {e}")
+
+    def _write_token(self):
+        if os.path.exists(self.token_file):
+            os.remove(self.token_file)
+        fd = os.open(self.token_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(self.token)
+
+    async def _serve(self):
+        asyncio = lazy_import("asyncio")
+        # Le jeton existe avant que le socket ou le port soient publiés
+        self._write_token()
+        if sys.platform != "win32":
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            self.server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+            os.chmod(self.socket_path, 0o600)
+        else:
+            self.server = await asyncio.start_server(self._handle_client, "127.0.0.1", 0)
+            with open(self.port_file, "w") as f:
+                f.write(str(self.server.sockets[0].getsockname()[1]))
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        for path in (self.socket_path, self.port_file, self.token_file):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def current_status(self):
+        status = dict(self.status)
+        if status["running"] and not status["paused"]:
+            status["remaining"] = max(0, int(math.ceil(status["remaining"] - (time.monotonic() - status["at"]))))
+        del status["at"]
+        return status
+
+    def publish(self, event_type, status=None):
+        """ Appelé depuis le thread Tk : un simple transfert vers la boucle asyncio. """
+        if status is not None:
+            self.status = dict(status, at=time.monotonic())
+        if self.subscriber_count and self.loop is not None:
+            self.loop.call_soon_threadsafe(self._fan_out, event_type)
+
+    def _fan_out(self, event_type):
+        line = (json.dumps(dict(self.current_status(), event=event_type), separators=(",", ":")) + "\n").encode()
+        for subscriber in self.subscribers:
+            if subscriber.full():
+                subscriber.get_nowait()
+                self.dropped_events += 1
+            subscriber.put_nowait(line)
+
+    async def _pump(self, subscriber, writer):
+        while True:
+            writer.write(await subscriber.get())
+            await writer.drain()
+
+    async def _handle_client(self, reader, writer):
+        asyncio = lazy_import("asyncio")
+        subscriber, pump = None, None
+        try:
+            first_line = await reader.readline()
+            command, _, argument = first_line.decode("utf-8", "replace").strip().partition(" ")
+            if command != "auth" or not hmac.compare_digest(argument.encode(), self.token.encode()):
+                writer.write(b'{"ok":false,"error":"authentification requise"}\n')
+                await writer.drain()
+                return
+            writer.write(b'{"ok":true}\n')
+            await writer.drain()
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                command, _, argument = raw.decode("utf-8", "replace").strip().partition(" ")
+                if command == "subscribe" and subscriber is None:
+                    subscriber = asyncio.Queue(maxsize=self.SUBSCRIBER_QUEUE_SIZE)
+                    self.subscribers.add(subscriber)
+                    self.subscriber_count = len(self.subscribers)
+                    if self.subscriber_count == 1:
+                        # Fenêtre masquée : le minuteur peut dormir jusqu'à la prochaine minute
+                        self.commands.post("on_first_subscriber")
+                    pump = asyncio.ensure_future(self._pump(subscriber, writer))
+                    reply = {"ok": True}
+                elif command == "status":
+                    reply = dict(self.current_status(), ok=True)
+                elif command in self.COMMANDS and (command != "add_task" or argument.strip()):
+                    args = (argument.strip(),) if command == "add_task" else ()
+                    self.commands.post(self.COMMANDS[command], *args)
+                    reply = {"ok": True}
+                else:
+                    reply = {"ok": False, "error": f"commande inconnue ou incomplète: {command}"}
+                writer.write((json.dumps(reply, separators=(",", ":")) + "\n").encode())
+                if pump is None:
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if subscriber is not None:
+                self.subscribers.discard(subscriber)
+                self.subscriber_count = len(self.subscribers)
+            if pump is not None:
+                pump.cancel()
+            writer.close()
+
+# --- Instance unique ---
+CLI_ACTIONS = {"--show": "show", "--start": "start", "--pause": "pause", "--resume": "resume",
+               "--skip": "skip", "--reset": "reset", "--add-task": "add_task"}
+
+def parse_cli_actions(argv):
+    """ Traduit --show, --skip, --add-task "texte"... en commandes de l'API locale. """
+    actions = []
+    index = 0
+    while index < len(argv):
+        command = CLI_ACTIONS.get(argv[index])
+        if command == "add_task":
+            if index + 1 < len(argv) and argv[index + 1].strip():
+                actions.append((command, argv[index + 1].strip()))
+            index += 1
+        elif command:
+            actions.append((command, ""))
+        index += 1
+    return actions
+
+class InstanceLock:
+    """ Verrou exclusif non bloquant sur un fichier, gardé ouvert toute la vie du processus. """
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    def acquire(self):
+        handle = open(self.path, "a+")
+        try:
+            if sys.platform == "win32":
+                msvcrt = lazy_import("msvcrt")
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl = lazy_import("fcntl")
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        self.handle = handle
+        return True
+
+def connect_control_socket(timeout=2.0):
+    if sys.platform != "win32":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(get_app_data_path("control.sock"))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    with open(get_app_data_path("control.port")) as f:
+        port = int(f.read())
+    return socket.create_connection(("127.0.0.1", port), timeout=timeout)
+
+def forward_to_running_instance(actions, timeout=3.0):
+    """ Transmet les actions (par défaut « show ») à l'instance en cours ; True si elle les a reçues. """
+    actions = actions or [("show", "")]
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            sock = connect_control_socket()
+            break
+        except (OSError, ValueError):
+            # L'instance principale peut être encore en train de démarrer son serveur
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+    try:
+        with open(get_app_data_path("control.token")) as f:
+            token = f.read().strip()
+    except OSError:
+        sock.close()
+        return False
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(f"auth {token}\n".encode("utf-8"))
+        stream.flush()
+        if not json.loads(stream.readline() or b"{}").get("ok"):
+            return False
+        for command, argument in actions:
+            stream.write(f"{command} {argument}".strip().encode("utf-8") + b"\n")
+            stream.flush()
+            stream.readline()
+    return True
+
+# --- Sons ---
+def synthesize_tone(segments, sample_rate=22050, volume=0.5):
+    """ Génère un WAV 16 bits mono en mémoire à partir de (fréquence Hz, durée ms), avec fondu de 5 ms. """
+    samples = array("h")
+    fade = int(sample_rate * 0.005)
+    for frequency, duration_ms in segments:
+        count = int(sample_rate * duration_ms / 1000)
+        for i in range(count):
+            envelope = min(1.0, i / fade, (count - i) / fade) if fade else 1.0
+            value = volume * envelope * math.sin(2 * math.pi * frequency * i / sample_rate)
+            samples.append(int(value * 32767))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+SOUND_TONES = {
+    "start": [(800, 100)],
+    "warning": [(1200, 250)],
+    "end_session": [(660, 150), (880, 150), (990, 250)],
+}
+
+class WinsoundBackend:
+    name = "winsound"
+
+    def __init__(self):
+        self.winsound = lazy_import("winsound")
+
+    def play(self, sound_type, wav_bytes):
+        self.winsound.PlaySound(wav_bytes, self.winsound.SND_MEMORY)
+
+class SimpleAudioBackend:
+    name = "simpleaudio"
+
+    def __init__(self):
+        self.simpleaudio = lazy_import("simpleaudio")
+
+    def play(self, sound_type, wav_bytes):
+        with wave.open(io.BytesIO(wav_bytes)) as wav:
+            frames = wav.readframes(wav.getnframes())
+            play = self.simpleaudio.play_buffer(frames, wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+        play.wait_done()
+
+class CommandAudioBackend:
+    """ Lecture via paplay (PulseAudio/PipeWire) ou aplay (ALSA) ; les WAV sont écrits une fois dans AppData. """
+    name = "command"
+    COMMANDS = (("paplay",), ("aplay", "-q"))
+
+    def __init__(self):
+        for command in self.COMMANDS:
+            path = shutil.which(command[0])
+            if path:
+                self.command = [path] + list(command[1:])
+                break
+        else:
+            raise RuntimeError("ni paplay ni aplay trouvé")
+        self.files = {}
+
+    def play(self, sound_type, wav_bytes):
+        if sound_type not in self.files:
+            path = get_app_data_path(f"sound_{sound_type}.wav")
+            with open(path, "wb") as f:
+                f.write(wav_bytes)
+            self.files[sound_type] = path
+        subprocess.run(self.command + [self.files[sound_type]], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5)
+
+class NullAudioBackend:
+    """ Backend muet, utilisé quand aucun lecteur n'est disponible. """
+    name = "null"
+
+    def play(self, sound_type, wav_bytes):
+        pass
+
+def default_audio_backend():
+    candidates = [WinsoundBackend] if sys.platform == "win32" else [SimpleAudioBackend, CommandAudioBackend]
+    for backend_class in candidates:
+        try:
+            return backend_class()
+        except Exception as e:
+            logging.info(f"Son : backend {backend_class.name} indisponible ({e}).")
+    logging.info("Aucun lecteur audio trouvé. Les sons seront désactivés.")
+    return NullAudioBackend()
+
+class AudioPlayer:
+    """ Un seul thread audio alimenté par une file bornée ; les sons trop anciens sont abandonnés. """
+    MAX_PENDING = 4
+    STALE_AFTER_SEC = 2.0
+
+    def __init__(self, backend_factory=default_audio_backend):
+        self.backend_factory = backend_factory
+        self.queue = queue.Queue(maxsize=self.MAX_PENDING)
+        self.buffers = {}
+        self.dropped = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def play(self, sound_type):
+        item = (time.monotonic(), sound_type)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # File pleine : on jette le plus ancien au profit du son le plus récent
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+
+    def _run(self):
+        backend = self.backend_factory()
+        # Tonalités synthétisées une seule fois, gardées en mémoire
+        self.buffers = {name: synthesize_tone(segments) for name, segments in SOUND_TONES.items()}
+        while True:
+            queued_at, sound_type = self.queue.get()
+            if time.monotonic() - queued_at > self.STALE_AFTER_SEC:
+                self.dropped += 1
+                continue
+            try:
+                backend.play(sound_type, self.buffers[sound_type])
+            except Exception as e:
+                logging.error(f"Erreur son: {e}")
+
+# --- Notifications ---
+class ToastBackend:
+    """ Notifications Windows (win10toast), avec un seul ToastNotifier réutilisé. """
+    name = "toast"
+
+    def __init__(self):
+        self.toaster = lazy_import("win10toast").ToastNotifier()
+
+    def send(self, title, message):
+        self.toaster.show_toast(title, message, icon_path=resource_path("Icon.ico"), duration=5, threaded=True)
+
+class NotifySendBackend:
+    """ Notifications freedesktop via la commande notify-send (sans attendre sa fin). """
+    name = "notify-send"
+
+    def __init__(self):
+        self.command = shutil.which("notify-send")
+        if not self.command:
+            raise RuntimeError("notify-send introuvable")
+
+    def send(self, title, message):
+        subprocess.Popen([self.command, "--app-name=Focus Pomodoro", "--expire-time=5000", title, message],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+class BannerBackend:
+    """ Bandeau non modal dans l'application (affiché par le thread Tk). """
+    name = "banner"
+
+    def __init__(self, app):
+        self.app = app
+
+    def send(self, title, message):
+        self.app.ui_commands.post("show_banner", title, message)
+
+class NotificationDispatcher:
+    """ File de notifications traitée par un seul thread : l'appelant ne bloque jamais.
+        Les doublons rapprochés sont fusionnés et le débit est limité. """
+    DUPLICATE_WINDOW_SEC = 30.0
+    MIN_INTERVAL_SEC = 2.0
+
+    def __init__(self, backend_factory, fallback=None):
+        self.backend_factory = backend_factory
+        self.fallback = fallback
+        self.backend = None
+        self.queue = queue.Queue()
+        self.last_sent = {}
+        self.last_send_time = -self.MIN_INTERVAL_SEC
+        self.metrics = {"sent": 0, "coalesced": 0, "errors": 0, "last_latency_ms": 0.0, "max_latency_ms": 0.0}
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def notify(self, title, message):
+        self.queue.put((time.monotonic(), title, message))
+
+    def _get_backend(self):
+        if self.backend is None:
+            try:
+                self.backend = self.backend_factory()
+            except Exception as e:
+                logging.warning(f"Notifications : backend indisponible ({e}), repli sur le bandeau.")
+                self.backend = self.fallback
+        return self.backend
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            # Seule la dernière notification d'un même titre est gardée
+            latest = {}
+            for item in batch:
+                latest[item[1]] = item
+            self.metrics["coalesced"] += len(batch) - len(latest)
+            for queued_at, title, message in latest.values():
+                self._dispatch(queued_at, title, message)
+
+    def _dispatch(self, queued_at, title, message):
+        now = time.monotonic()
+        key = (title, message)
+        if key in self.last_sent and now - self.last_sent[key] < self.DUPLICATE_WINDOW_SEC:
+            self.metrics["coalesced"] += 1
+            return
+        wait = self.MIN_INTERVAL_SEC - (now - self.last_send_time)
+        if wait > 0:
+            time.sleep(wait)
+        backend = self._get_backend()
+        try:
+            backend.send(title, message)
+        except Exception as e:
+            logging.error(f"Erreur de notification: {e}")
+            self.metrics["errors"] += 1
+            if self.fallback is not None and backend is not self.fallback:
+                self.fallback.send(title, message)
+        self.last_send_time = self.last_sent[key] = time.monotonic()
+        latency_ms = (self.last_send_time - queued_at) * 1000
+        self.metrics["sent"] += 1
+        self.metrics["last_latency_ms"] = latency_ms
+        self.metrics["max_latency_ms"] = max(self.metrics["max_latency_ms"], latency_ms)
+
+def default_notification_backend():
+    if sys.platform == "win32":
+        return ToastBackend()
+    if sys.platform.startswith("linux"):
+        return NotifySendBackend()
+    raise RuntimeError(f"aucun backend natif pour {sys.platform}")
+
+# --- Modèle de vue : seules les vraies modifications atteignent Tk et l'icône ---
+class ViewModel:
+    """ Retient la dernière valeur rendue de chaque propriété affichée (widget, option) et
+        n'appelle configure que pour celles qui changent. Compte les appels Tk par seconde. """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.rendered = {}
+        self.tk_calls = 0
+        self.skipped = 0
+        self.tray_updates = 0
+        self.calls_per_sec = 0.0
+        self._window_start = clock()
+        self._window_calls = 0
+
+    def _roll(self, now):
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.calls_per_sec = self._window_calls / elapsed
+            self._window_start, self._window_calls = now, 0
+
+    def rate(self):
+        """ Appels Tk par seconde sur la dernière fenêtre d'au moins une seconde. """
+        self._roll(self.clock())
+        return self.calls_per_sec
+
+    def set(self, widget, **options):
+        changes = {option: value for option, value in options.items()
+                   if (widget, option) not in self.rendered or self.rendered[(widget, option)] != value}
+        self.skipped += len(options) - len(changes)
+        if not changes:
+            return False
+        widget.configure(**changes)
+        for option, value in changes.items():
+            self.rendered[(widget, option)] = value
+        self.count_call()
+        return True
+
+    def count_call(self):
+        """ À appeler par les widgets qui diffèrent eux-mêmes leurs mises à jour (TimerCanvas). """
+        self.tk_calls += 1
+        self._window_calls += 1
+        self._roll(self.clock())
+
+    def get(self, widget, option):
+        """ Valeur rendue, sans relire Tk (cget) quand elle est connue. """
+        if (widget, option) in self.rendered:
+            return self.rendered[(widget, option)]
+        return widget.cget(option)
+
+    def set_tray(self, tray, image_key, title, render):
+        """ render(*image_key) n'est appelé, et l'icône mise à jour, que si l'image ou le titre change. """
+        if self.rendered.get((tray, "image")) == image_key and self.rendered.get((tray, "title")) == title:
+            self.skipped += 1
+            return False
+        tray.update(render(*image_key), title)
+        self.rendered[(tray, "image")] = image_key
+        self.rendered[(tray, "title")] = title
+        self.tray_updates += 1
+        return True
+
+# --- Indicateur de cycle (🍅) ---
+class CycleIndicator:
+    """ Pool persistant de labels 🍅 : redimensionné seulement quand la taille du cycle change,
+        et seuls les labels dont l'état rempli/vide ou la couleur change sont reconfigurés. """
+    EMPTY_COLOR = "#ACACAC"
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.labels = []
+        self.filled = 0
+        self.bg_color = None
+        self.fg_color = None
+
+    def _color_for(self, index, filled):
+        return self.fg_color if index < filled else self.EMPTY_COLOR
+
+    def update(self, size, filled, fg_color, bg_color):
+        filled = max(0, min(filled, size))
+        while len(self.labels) > size:
+            self.labels.pop().destroy()
+        self.filled = min(self.filled, len(self.labels))
+
+        if bg_color != self.bg_color or fg_color != self.fg_color:
+            self.bg_color, self.fg_color = bg_color, fg_color
+            self.frame.configure(bg=bg_color)
+            for i, label in enumerate(self.labels):
+                label.configure(fg=self._color_for(i, filled), bg=bg_color)
+        else:
+            # Seule la zone entre l'ancien et le nouveau compteur change de couleur
+            for i in range(min(self.filled, filled), max(self.filled, filled)):
+                if i < len(self.labels):
+                    self.labels[i].configure(fg=self._color_for(i, filled))
+
+        for i in range(len(self.labels), size):
+            label = tk.Label(self.frame, text="🍅", font=("Segoe UI Emoji", 26), fg=self._color_for(i, filled), bg=bg_color)
+            label.pack(side="left")
+            self.labels.append(label)
+        self.filled = filled
+
+# --- Affichage du minuteur sur Canvas ---
+class TimerCanvas(tk.Canvas):
+    """ Minuteur sur un Canvas de taille fixe : un élément texte par caractère de « MM:SS », centré
+        dans une case mesurée une fois (le chiffre le plus large), donc aucun recalcul de disposition.
+        L'anneau de progression est une ligne dont seuls les points (coords) changent. """
+    RING_SEGMENTS = 240
+    RING_WIDTH = 6
+    PADDING = 8
+
+    def __init__(self, parent, timer_font, view, show_ring=True):
+        self.view = view
+        digit_width = max(timer_font.measure(digit) for digit in "0123456789")
+        slots = [digit_width, digit_width, timer_font.measure(":"), digit_width, digit_width]
+        # Une case de chiffre de marge de chaque côté : l'anneau elliptique passe loin des chiffres
+        margin = digit_width + self.PADDING
+        width = sum(slots) + 2 * margin
+        height = timer_font.metrics("linespace") + 2 * self.PADDING
+        super().__init__(parent, width=width, height=height, highlightthickness=0, borderwidth=0)
+        self.chars = list("00:00")
+        self.char_items = []
+        x = margin
+        for slot, char in zip(slots, self.chars):
+            self.char_items.append(self.create_text(x + slot / 2, height / 2, text=char, font=timer_font, anchor="center"))
+            x += slot
+
+        inset = (self.PADDING + self.RING_WIDTH) / 2
+        cx, cy, rx, ry = width / 2, height / 2, width / 2 - inset, height / 2 - inset
+        self.track_item = self.create_oval(cx - rx, cy - ry, cx + rx, cy + ry, width=self.RING_WIDTH)
+        # Points précalculés : départ en haut, sens horaire
+        self.ring_points = []
+        for i in range(self.RING_SEGMENTS + 1):
+            angle = 2 * math.pi * i / self.RING_SEGMENTS
+            self.ring_points += [cx + rx * math.sin(angle), cy - ry * math.cos(angle)]
+        self.ring_item = self.create_line(*self.ring_points[:2] * 2, width=self.RING_WIDTH, capstyle="round")
+        self.segments = 0
+        self.colors = None
+        self.set_ring_visible(show_ring)
+
+    def set_time(self, text):
+        for index, char in enumerate(text[:len(self.chars)]):
+            if self.chars[index] != char:
+                self.chars[index] = char
+                self.itemconfigure(self.char_items[index], text=char)
+                self.view.count_call()
+
+    def set_progress(self, fraction):
+        segments = max(0, min(self.RING_SEGMENTS, int(fraction * self.RING_SEGMENTS)))
+        if segments == self.segments:
+            return
+        self.segments = segments
+        if segments:
+            self.coords(self.ring_item, *self.ring_points[:2 * segments + 2])
+        else:
+            self.coords(self.ring_item, *self.ring_points[:2] * 2)
+        self.view.count_call()
+
+    def set_colors(self, bg_color, fg_color, track_color):
+        self.view.set(self, bg=bg_color)
+        if self.colors == (fg_color, track_color):
+            return
+        self.colors = (fg_color, track_color)
+        for item in self.char_items:
+            self.itemconfigure(item, fill=fg_color)
+        self.itemconfigure(self.ring_item, fill=fg_color)
+        self.itemconfigure(self.track_item, outline=track_color)
+        self.view.count_call()
+
+    def set_ring_visible(self, visible):
+        state = "normal" if visible else "hidden"
+        self.itemconfigure(self.track_item, state=state)
+        self.itemconfigure(self.ring_item, state=state)
+
+def run_display_benchmark(frames=600):
+    """ Compare le coût d'une image (changement de texte + traitement des tâches Tk en attente)
+        entre l'ancien Label extensible et le TimerCanvas. Nécessite un affichage. """
+    root = tk.Tk()
+    root.geometry("560x480")
+    timer_font = font.Font(root, family="Segoe UI Light", size=110, weight="bold")
+    frame = tk.Frame(root)
+    frame.pack(expand=True, fill="both")
+    label = tk.Label(frame, text="25:00", font=timer_font)
+    label.pack(expand=True, fill="both")
+    canvas = TimerCanvas(frame, timer_font, ViewModel())
+    root.update()
+    results = {}
+    for name, render in (("label", lambda text, fraction: label.config(text=text)),
+                         ("canvas", lambda text, fraction: (canvas.set_time(text), canvas.set_progress(fraction)))):
+        if name == "canvas":
+            label.pack_forget()
+            canvas.pack(expand=True)
+            root.update()
+        start = time.perf_counter()
+        for frame_index in range(frames):
+            minutes, seconds = divmod(1500 - frame_index, 60)
+            render(f"{minutes:02d}:{seconds:02d}", frame_index / frames)
+            root.update_idletasks()
+        results[name] = (time.perf_counter() - start) / frames * 1e6
+    root.destroy()
+    return results
+
+# --- Index de recherche des tâches ---
+class TaskIndex:
+    """ Index inversé en mémoire : mots du texte (casefold) -> tâches, étiquettes #tag -> tâches, et
+        ensemble des tâches terminées. Ajouter, mettre à jour ou supprimer une tâche ne touche que
+        les entrées de cette tâche. Un terme de recherche est cherché dans le vocabulaire (sous-chaîne
+        d'un mot), bien plus petit que la liste des tâches. """
+    STATUSES = ("all", "pending", "done")
+    MIN_INDEXED_TERM = 2
+
+    def __init__(self, tasks=()):
+        self.words = {}
+        self.tags = {}
+        self.done = set()
+        self.entries = {}
+        self.version = 0
+        self._seq = 0
+        for task in tasks:
+            self.add(task)
+
+    @staticmethod
+    def tags_of(text):
+        return {word[1:].casefold() for word in text.split() if word.startswith("#") and len(word) > 1}
+
+    @classmethod
+    def parse_query(cls, query):
+        """ Sépare la requête en étiquettes (#tag) et en termes à chercher dans le texte. """
+        tags = cls.tags_of(query)
+        terms = [word.casefold() for word in query.split() if not word.startswith("#")]
+        return terms, tags
+
+    def _index_text(self, key, entry):
+        for index, names in ((self.words, entry["words"]), (self.tags, entry["tags"])):
+            for name in names:
+                index.setdefault(name, set()).add(key)
+
+    def _unindex_text(self, key, entry):
+        for index, names in ((self.words, entry["words"]), (self.tags, entry["tags"])):
+            for name in names:
+                keys = index.get(name)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[name]
+
+    def add(self, task):
+        key = id(task)
+        text = task['text'].casefold()
+        self._seq += 1
+        entry = {"key": key, "task": task, "seq": self._seq, "text": text, "words": set(text.split()), "tags": self.tags_of(task['text'])}
+        self.entries[key] = entry
+        self._index_text(key, entry)
+        if task['done']:
+            self.done.add(key)
+        self.version += 1
+
+    def update(self, task):
+        key = id(task)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.add(task)
+            return
+        text = task['text'].casefold()
+        if text != entry["text"]:
+            self._unindex_text(key, entry)
+            entry.update(text=text, words=set(text.split()), tags=self.tags_of(task['text']))
+            self._index_text(key, entry)
+        if task['done']:
+            self.done.add(key)
+        else:
+            self.done.discard(key)
+        self.version += 1
+
+    def remove(self, task):
+        key = id(task)
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self._unindex_text(key, entry)
+        self.done.discard(key)
+        self.version += 1
+
+    def all_tags(self, limit=None):
+        """ Étiquettes existantes, les plus utilisées d'abord. """
+        return sorted(self.tags, key=lambda tag: (-len(self.tags[tag]), tag))[:limit]
+
+    def _term_keys(self, term):
+        keys = set()
+        for word, word_keys in self.words.items():
+            if term in word:
+                keys |= word_keys
+        return keys
+
+    def _matches(self, key, terms, tags, status):
+        if status == "done" and key not in self.done or status == "pending" and key in self.done:
+            return False
+        entry = self.entries.get(key)
+        if entry is None or not tags <= entry["tags"]:
+            return False
+        return all(term in entry["text"] for term in terms)
+
+    def search(self, query, status="all", within=None):
+        """ Tâches correspondant à la requête, dans l'ordre de la liste. within (résultat d'une requête
+            plus large) limite la vérification à ces tâches : recherche incrémentale à la frappe. """
+        terms, tags = self.parse_query(query)
+        if within is not None:
+            return [task for task in within if self._matches(id(task), terms, tags, status)]
+        if not terms and not tags:
+            if status == "all":
+                return [entry["task"] for entry in self.entries.values()]
+            done = status == "done"
+            return [entry["task"] for entry in self.entries.values() if (entry["key"] in self.done) == done]
+        rest = sorted(terms, key=len)
+        longest = rest.pop() if rest else None
+        if longest is not None and len(longest) < self.MIN_INDEXED_TERM and not tags:
+            # Terme très court : parcourir les textes coûte moins que réunir les postings de tout le vocabulaire
+            entries = self.entries.values()
+            for term in terms:
+                entries = [entry for entry in entries if term in entry["text"]]
+            if status != "all":
+                done = status == "done"
+                entries = [entry for entry in entries if (entry["key"] in self.done) == done]
+            return [entry["task"] for entry in entries]
+        postings = [self.tags.get(tag, set()) for tag in tags]
+        if longest is not None:
+            # Exact pour ce terme (il ne contient pas d'espace) ; les autres sont vérifiés sur le texte
+            postings.append(self._term_keys(longest))
+        if status == "done":
+            postings.append(self.done)
+        postings.sort(key=len)
+        keys = set(postings[0])
+        for posting in postings[1:]:
+            keys &= posting
+        if len(keys) * 8 > len(self.entries):
+            candidates = [key for key in self.entries if key in keys]
+        else:
+            candidates = sorted(keys, key=lambda key: self.entries[key]["seq"])
+        if status == "pending":
+            candidates = [key for key in candidates if key not in self.done]
+        entries = [self.entries[key] for key in candidates]
+        for term in rest:
+            entries = [entry for entry in entries if term in entry["text"]]
+        return [entry["task"] for entry in entries]
+
 # --- Fenêtre de gestion des tâches ---
 class TasksWindow(tk.Toplevel):
+    ROW_HEIGHT = 34
+    STATUS_FILTERS = {"Toutes": "all", "En cours": "pending", "Terminées": "done"}
+    ALL_TAGS = "Étiquettes"
+    MAX_TAG_CHOICES = 30
+
     def __init__(self, parent, icon_photo_image=None, close_callback=None):
         super().__init__(parent)
         self.parent = parent
@@ -231,48 +2524,145 @@ class TasksWindow(tk.Toplevel):
         add_button = tk.Button(add_frame, text="Ajouter", command=self.add_task, relief="flat", bg="#4CAF50", fg="white")
         add_button.pack(side="left", padx=(5, 0), ipady=1)
 
+        # Recherche incrémentale (mots et #étiquettes) et filtre par état
+        search_frame = tk.Frame(self, bg=self.theme["bg_task"])
+        search_frame.pack(padx=10, fill="x")
+        tk.Label(search_frame, text="🔍", bg=self.theme["bg_task"], fg=self.theme["fg_main"]).pack(side="left")
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(search_frame, textvariable=self.search_var, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], insertbackground=self.theme["fg_main"], relief="flat")
+        search_entry.pack(side="left", expand=True, fill="x", ipady=3, padx=(5, 5))
+        self.status_var = tk.StringVar(value="Toutes")
+        status_menu = tk.OptionMenu(search_frame, self.status_var, *self.STATUS_FILTERS)
+        status_menu.config(bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], activebackground=self.theme["bg_task_item"], relief="flat", highlightthickness=0)
+        status_menu.pack(side="left")
+        self.tag_var = tk.StringVar(value=self.ALL_TAGS)
+        self.tag_menu = tk.OptionMenu(search_frame, self.tag_var, self.ALL_TAGS)
+        self.tag_menu.config(bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], activebackground=self.theme["bg_task_item"], relief="flat", highlightthickness=0)
+        # Les choix sont relus dans l'index à chaque ouverture du menu
+        self.tag_menu["menu"].configure(postcommand=self.refresh_tag_choices)
+        self.tag_menu.pack(side="left", padx=(5, 0))
+        self.filtered = None
+        self._last_filter = None
+        self.search_var.trace_add("write", lambda *args: self.on_filter_changed())
+        self.status_var.trace_add("write", lambda *args: self.on_filter_changed())
+        self.tag_var.trace_add("write", lambda *args: self.on_filter_changed())
+
         canvas_frame = tk.Frame(self, bg=self.theme["bg_task"])
         canvas_frame.pack(pady=10, padx=10, expand=True, fill="both")
-        self.canvas = tk.Canvas(canvas_frame, bg=self.theme["bg_task"], highlightthickness=0)
-        scrollbar = tk.Scrollbar(canvas_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg=self.theme["bg_task"])
-
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        # Liste virtualisée : seules les lignes visibles existent, et elles sont recyclées au défilement
+        self.canvas = tk.Canvas(canvas_frame, bg=self.theme["bg_task"], highlightthickness=0, yscrollincrement=self.ROW_HEIGHT)
+        self.scrollbar = tk.Scrollbar(canvas_frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_canvas_scroll)
         self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        self.task_widgets = []
-        self.load_tasks()
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.bind("<Configure>", self.on_canvas_configure)
+        self._bind_wheel(self.canvas)
+
+        self.rows = []
+        self.row_width = 1
+        self.update_scrollregion()
+        # L'index est construit après le premier affichage, pas à la première frappe
+        self.after_idle(lambda: self.parent.task_index)
+
+    def visible_tasks(self):
+        return self.parent.tasks if self.filtered is None else self.filtered
+
+    def refresh_tag_choices(self):
+        menu = self.tag_menu["menu"]
+        menu.delete(0, "end")
+        choices = [self.ALL_TAGS] + ["#" + tag for tag in self.parent.task_index.all_tags(self.MAX_TAG_CHOICES)]
+        for choice in choices:
+            menu.add_command(label=choice, command=lambda c=choice: self.tag_var.set(c))
+
+    def apply_filter(self):
+        query = self.search_var.get().strip()
+        if self.tag_var.get() != self.ALL_TAGS:
+            query = f"{query} {self.tag_var.get()}".strip()
+        status = self.STATUS_FILTERS[self.status_var.get()]
+        if not query and status == "all":
+            self.filtered, self._last_filter = None, None
+            return
+        index = self.parent.task_index
+        within = None
+        previous = self._last_filter
+        # Requête qui prolonge la précédente (sans étiquette, ces dernières étant exactes) :
+        # seuls les résultats précédents sont revérifiés
+        if (previous and previous[0] and query.startswith(previous[0]) and previous[1] == status
+                and previous[2] == index.version and "#" not in query):
+            within = previous[3]
+        self.filtered = index.search(query, status, within)
+        self._last_filter = (query, status, index.version, self.filtered)
+
+    def on_filter_changed(self):
+        self.apply_filter()
+        self.canvas.yview_moveto(0)
+        self.update_scrollregion()
+        self.refresh_rows()
 
     def add_task(self):
         task_text = self.task_entry.get().strip()
         if not task_text: return
         task_data = {'text': task_text, 'done': False}
         self.parent.tasks.append(task_data)
-        self.parent.save_data()
+        self.parent.on_task_added(task_data)
         self.task_entry.delete(0, tk.END)
-        self.create_task_widget(task_data)
-
-    def create_task_widget(self, task_data):
-        task_frame = tk.Frame(self.scrollable_frame, bg=self.theme["bg_task_item"])
-        var = tk.BooleanVar(value=task_data['done'])
-        label = tk.Label(task_frame, text=task_data['text'], bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=self.task_font, padx=5, anchor="w")
+        self.apply_filter()
+        self.update_scrollregion()
+        self.canvas.yview_moveto(1.0)
+        self.refresh_rows()
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(int(-e.delta / 120) or (-1 if e.delta > 0 else 1), "units"))
+        widget.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+    def create_row(self):
+        """ Crée une ligne recyclable ; elle sera rattachée à une tâche par bind_row. """
+        task_frame = tk.Frame(self.canvas, bg=self.theme["bg_task_item"])
+        var = tk.BooleanVar(value=False)
+        label = tk.Label(task_frame, text="", bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=self.task_font, padx=5, anchor="w")
         label.pack(side="left", expand=True, fill="x")
         check = tk.Checkbutton(task_frame, variable=var, bg=self.theme["bg_task_item"], activebackground=self.theme["bg_task_item"], relief="flat", highlightthickness=0, borderwidth=0, selectcolor="#fafafa")
         check.pack(side="left")
-        delete_btn = tk.Button(task_frame, text="🗑️", bg=self.theme["bg_task_item"], fg="#ff6666", relief="flat", command=lambda d=task_data: self.delete_task(d))
+        delete_btn = tk.Button(task_frame, text="🗑️", bg=self.theme["bg_task_item"], fg="#ff6666", relief="flat")
         delete_btn.pack(side="right")
-
-        def toggle_task():
-            task_data['done'] = var.get()
-            self.update_task_display(label, task_data)
-            self.parent.save_data()
-        check.config(command=toggle_task)
-        self.update_task_display(label, task_data)
-        task_frame.pack(fill="x", pady=2, padx=2)
-        self.task_widgets.append({'frame': task_frame, 'data': task_data})
+        row = {'frame': task_frame, 'label': label, 'var': var, 'data': None, 'index': None, 'shown': None}
+        check.config(command=lambda r=row: self.toggle_task(r))
+        delete_btn.config(command=lambda r=row: self.delete_task(r['data'], r['index']))
+        for widget in (task_frame, label, check, delete_btn):
+            self._bind_wheel(widget)
+        row['window'] = self.canvas.create_window(2, 0, window=task_frame, anchor="nw", width=self.row_width, height=self.ROW_HEIGHT - 4, state="hidden")
+        self.rows.append(row)
+        return row
+
+    def bind_row(self, row, index, task_data):
+        if row['index'] != index:
+            self.canvas.coords(row['window'], 2, index * self.ROW_HEIGHT + 2)
+            row['index'] = index
+        shown = (task_data['text'], task_data['done'])
+        if row['data'] is not task_data or row['shown'] != shown:
+            row['label'].config(text=task_data['text'])
+            row['var'].set(task_data['done'])
+            self.update_task_display(row['label'], task_data)
+            row['shown'] = shown
+        if row['data'] is None:
+            self.canvas.itemconfigure(row['window'], state="normal")
+        row['data'] = task_data
+
+    def unbind_row(self, row):
+        if row['data'] is not None:
+            self.canvas.itemconfigure(row['window'], state="hidden")
+            row['data'], row['index'], row['shown'] = None, None, None
+
+    def toggle_task(self, row):
+        task_data = row['data']
+        if task_data is None: return
+        task_data['done'] = row['var'].get()
+        row['shown'] = (task_data['text'], task_data['done'])
+        self.update_task_display(row['label'], task_data)
+        self.parent.on_task_updated(task_data)
+        if self.filtered is not None and self.status_var.get() != "Toutes":
+            self.redraw_tasks()
 
     def update_task_display(self, label, task_data):
         if task_data['done']:
@@ -280,18 +2670,50 @@ class TasksWindow(tk.Toplevel):
         else:
             label.config(font=self.task_font, fg=self.theme["fg_main"])
 
-    def delete_task(self, task_to_delete):
-        self.parent.tasks.remove(task_to_delete)
-        self.parent.save_data()
+    def delete_task(self, task_to_delete, index=None):
+        if task_to_delete is None: return
+        tasks = self.parent.tasks
+        if index is None or index >= len(tasks) or tasks[index] is not task_to_delete:
+            # Liste filtrée : index est une position dans le résultat. On cherche par identité,
+            # list.remove supprimerait la première tâche égale (même texte, même état)
+            index = next(i for i, task in enumerate(tasks) if task is task_to_delete)
+        del tasks[index]
+        self.parent.on_task_deleted(task_to_delete)
         self.redraw_tasks()
 
     def redraw_tasks(self):
-        for widget_info in self.task_widgets: widget_info['frame'].destroy()
-        self.task_widgets.clear()
-        self.load_tasks()
-
-    def load_tasks(self):
-        for task_data in self.parent.tasks: self.create_task_widget(task_data)
+        self.apply_filter()
+        self.update_scrollregion()
+        self.refresh_rows()
+
+    def update_scrollregion(self):
+        height = len(self.visible_tasks()) * self.ROW_HEIGHT
+        self.canvas.configure(scrollregion=(0, 0, self.row_width, max(height, 1)))
+
+    def on_canvas_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh_rows()
+
+    def on_canvas_configure(self, event):
+        self.row_width = max(1, event.width - 4)
+        needed = event.height // self.ROW_HEIGHT + 2
+        while len(self.rows) < needed:
+            self.create_row()
+        for row in self.rows:
+            self.canvas.itemconfigure(row['window'], width=self.row_width)
+        self.update_scrollregion()
+        self.refresh_rows()
+
+    def refresh_rows(self):
+        """ Rattache le pool de lignes aux tâches visibles dans la fenêtre du canvas. """
+        tasks = self.visible_tasks()
+        first = max(0, int(self.canvas.canvasy(0)) // self.ROW_HEIGHT)
+        for offset, row in enumerate(self.rows):
+            index = first + offset
+            if index < len(tasks):
+                self.bind_row(row, index, tasks[index])
+            else:
+                self.unbind_row(row)
 
 # --- FENÊTRE "À PROPOS" ---
 class AboutWindow(tk.Toplevel):
@@ -309,9 +2731,10 @@ class AboutWindow(tk.Toplevel):
         self.protocol("WM_DELETE_WINDOW", self.close_callback)
 
         try:
+            Image = lazy_import("PIL.Image")
             logo_image = Image.open(resource_path("logo.png"))
             logo_image = logo_image.resize((250, int(250 * logo_image.height / logo_image.width)), Image.LANCZOS)
-            self.logo_photo = ImageTk.PhotoImage(logo_image)
+            self.logo_photo = lazy_import("PIL.ImageTk").PhotoImage(logo_image)
             logo_label = tk.Label(self, image=self.logo_photo, bg=self.theme["bg_task"])
             logo_label.pack(pady=1)
         except Exception:
@@ -326,8 +2749,113 @@ class AboutWindow(tk.Toplevel):
         ok_button = tk.Button(self, text="OK", command=self.close_callback, relief="flat", bg="#0F9D58", fg="white", width=10)
         ok_button.pack(pady=10)
 
+# --- Graphiques des statistiques (rendus hors du thread Tk) ---
+MONTH_INITIALS = "JFMAMJJASOND"
+
+def _blend_color(background, foreground, ratio):
+    return tuple(int(b + (f - b) * ratio) for b, f in zip(background, foreground))
+
+def render_stats_charts(start_ordinal, counts, colors):
+    """ Exécuté dans un processus séparé : carte annuelle (une colonne par semaine, à partir d'un
+        lundi) et barres des 12 dernières semaines. Retourne l'image en PNG. """
+    Image = lazy_import("PIL.Image")
+    ImageColor = lazy_import("PIL.ImageColor")
+    ImageDraw = lazy_import("PIL.ImageDraw")
+    ImageFont = lazy_import("PIL.ImageFont")
+    background, accent, text = (ImageColor.getrgb(colors[key]) for key in ("bg", "accent", "fg"))
+    levels = [_blend_color(background, accent, ratio) for ratio in (0.12, 0.35, 0.6, 0.8, 1.0)]
+    cell, gap, left, top = 6, 1, 14, 14
+    weeks = (len(counts) + 6) // 7
+    width = left + weeks * (cell + gap) + 4
+    bars_top = top + 7 * (cell + gap) + 22
+    bars_height = 80
+    image = Image.new("RGB", (width, bars_top + bars_height + 14), background)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+
+    peak = max(counts, default=0) or 1
+    for index, count in enumerate(counts):
+        week, weekday = divmod(index, 7)
+        x, y = left + week * (cell + gap), top + weekday * (cell + gap)
+        level = 0 if count == 0 else 1 + min(3, (count - 1) * 4 // peak)
+        draw.rectangle((x, y, x + cell - 1, y + cell - 1), fill=levels[level])
+        day = date.fromordinal(start_ordinal + index)
+        if weekday == 0 and day.day <= 7:
+            draw.text((x, 0), MONTH_INITIALS[day.month - 1], fill=text, font=font)
+    for weekday, label in ((0, "L"), (2, "M"), (4, "V")):
+        draw.text((0, top + weekday * (cell + gap) - 3), label, fill=text, font=font)
+
+    weekly = [sum(counts[start:start + 7]) for start in range(0, len(counts), 7)][-12:]
+    bar_peak = max(weekly, default=0) or 1
+    slot = (width - left) / max(len(weekly), 1)
+    first_week = weeks - len(weekly)
+    for index, total in enumerate(weekly):
+        x0 = left + index * slot + 2
+        bar_height = int((bars_height - 14) * total / bar_peak)
+        bottom = bars_top + bars_height
+        if total:
+            draw.rectangle((x0, bottom - bar_height, x0 + slot - 5, bottom), fill=accent)
+            draw.text((x0, bottom - bar_height - 12), str(total), fill=text, font=font)
+        iso_week = date.fromordinal(start_ordinal + (first_week + index) * 7).isocalendar()[1]
+        draw.text((x0, bottom + 2), f"S{iso_week}", fill=text, font=font)
+
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+class StatsChartCache:
+    """ Dernière image des graphiques, indexée par (version des stats, thème). Un seul processus de
+        rendu, créé au premier besoin ; le résultat revient au thread Tk par on_rendered. """
+    def __init__(self, on_rendered):
+        self.on_rendered = on_rendered
+        self.executor = None
+        self.key = None
+        self.png = None
+        self.pending_key = None
+        self.renders = 0
+
+    def get(self, key, args_factory):
+        """ Retourne l'image connue (éventuellement périmée) et lance un rendu si key a changé. """
+        if key != self.key and key != self.pending_key:
+            try:
+                if self.executor is None:
+                    self.executor = lazy_import("concurrent.futures").ProcessPoolExecutor(
+                        max_workers=1, mp_context=lazy_import("multiprocessing").get_context("spawn"))
+                future = self.executor.submit(render_stats_charts, *args_factory())
+            except Exception as e:
+                logging.warning(f"Rendu des graphiques impossible: {e}")
+                return self.png
+            self.pending_key = key
+            future.add_done_callback(lambda f: self._done(key, f))
+        return self.png
+
+    def _done(self, key, future):
+        # Thread de l'exécuteur : on ne fait que transmettre au thread Tk
+        try:
+            png = future.result()
+        except Exception as e:
+            logging.warning(f"Échec du rendu des graphiques: {e}")
+            png = None
+        self.on_rendered(key, png)
+
+    def store(self, key, png):
+        if key == self.pending_key:
+            self.pending_key = None
+        # Sans PIL (png None), la clé est tout de même retenue pour ne pas relancer en boucle
+        self.key = key
+        if png is not None:
+            self.png = png
+            self.renders += 1
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
 # --- FENÊTRE STATISTIQUES ---
 class StatsWindow(tk.Toplevel):
+    PAGE_SIZE = 60
+
     def __init__(self, parent, icon_photo_image=None, close_callback=None):
         super().__init__(parent)
         self.parent = parent
@@ -335,7 +2863,7 @@ class StatsWindow(tk.Toplevel):
         self.close_callback = close_callback
         if icon_photo_image: self.iconphoto(False, icon_photo_image)
         self.title("Statistiques de Productivité")
-        self.geometry("400x450")
+        self.geometry("440x700")
         self.configure(bg=self.theme["bg_task"])
         self.transient(parent)
         self.grab_set()
@@ -361,6 +2889,32 @@ class StatsWindow(tk.Toplevel):
         tk.Label(tasks_stats_frame, text=f"Tâches complétées : {completed_tasks}", bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Segoe UI", 11)).pack(pady=5, padx=10, anchor="w")
         tk.Label(tasks_stats_frame, text=f"Tâches en attente : {pending_tasks}", bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Segoe UI", 11)).pack(pady=5, padx=10, anchor="w")
 
+        rollups_frame = tk.Frame(main_frame, bg=self.theme["bg_task_item"], relief="solid", borderwidth=1, bd=1)
+        rollups_frame.pack(pady=(0, 10), padx=10, fill="x")
+
+        summary = self.parent.stats_rollups.summary()
+        rollup_lines = (
+            f"Aujourd'hui : {summary['today']}   Semaine : {summary['week']}   Mois : {summary['month']}   Année : {summary['year']}",
+            f"Série actuelle : {summary['streak']} j   Record : {summary['longest_streak']} j",
+            f"Moyenne 7 j : {summary['avg_7']:.1f}   Moyenne 30 j : {summary['avg_30']:.1f}",
+        )
+        records = self.parent.session_records
+        if records.count and records.ready:
+            hours = records.hour_histogram()
+            best_hour = f"{hours.index(max(hours))} h" if any(hours) else "-"
+            rollup_lines += (
+                f"Sessions passées : {records.skip_rates()['work']:.0%}   Concentration : {records.focus_ratio():.0%}   Meilleure heure : {best_hour}",
+            )
+        for line in rollup_lines:
+            tk.Label(rollups_frame, text=line, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Segoe UI", 10)).pack(pady=2, padx=10, anchor="w")
+
+        charts_frame = tk.Frame(main_frame, bg=self.theme["bg_task_item"], relief="solid", borderwidth=1, bd=1)
+        charts_frame.pack(pady=(0, 10), padx=10, fill="x")
+        self.chart_image = None
+        self.charts_label = tk.Label(charts_frame, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Segoe UI", 10))
+        self.charts_label.pack(pady=5, padx=5)
+        self.show_charts()
+
         pomodoro_frame = tk.Frame(main_frame, bg=self.theme["bg_task_item"], relief="solid", borderwidth=1, bd=1)
         pomodoro_frame.pack(pady=10, padx=10, fill="both", expand=True)
         
@@ -369,42 +2923,204 @@ class StatsWindow(tk.Toplevel):
         stats_text_frame = tk.Frame(pomodoro_frame, bg=self.theme["bg_task_item"])
         stats_text_frame.pack(expand=True, fill="both", padx=10, pady=10)
 
-        stats_text = tk.Text(stats_text_frame, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Segoe UI", 11), relief="flat", highlightthickness=0)
-        scrollbar = tk.Scrollbar(stats_text_frame, orient="vertical", command=stats_text.yview)
-        stats_text.configure(yscrollcommand=scrollbar.set)
-        stats_text.pack(side="left", expand=True, fill="both")
-        scrollbar.pack(side="right", fill="y")
+        self.stats_text = tk.Text(stats_text_frame, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Segoe UI", 11), relief="flat", highlightthickness=0)
+        self.stats_scrollbar = tk.Scrollbar(stats_text_frame, orient="vertical", command=self.stats_text.yview)
+        self.stats_text.configure(yscrollcommand=self.on_stats_scroll)
+        self.stats_text.pack(side="left", expand=True, fill="both")
+        self.stats_scrollbar.pack(side="right", fill="y")
 
-        stats_data = self.parent.stats
-        sorted_dates = sorted(stats_data.keys(), reverse=True)
-        
-        display_text = ""
-        total_pomodoros = 0
-        if not stats_data:
-            display_text = "Aucun pomodoro complété."
+        self.rollups = self.parent.stats_rollups
+        self.days_shown = 0
+        if not self.parent.stats:
+            self.stats_text.insert(tk.END, "Aucun pomodoro complété.")
         else:
-            for stat_date in sorted_dates:
-                count = stats_data[stat_date]
-                total_pomodoros += count
-                plural = 's' if count > 1 else ''
-                display_text += f"{stat_date}: {count} Pomodoro{plural}\n"
-
-        stats_text.insert(tk.END, display_text)
-        stats_text.config(state="disabled")
+            self.load_next_page()
+        self.stats_text.config(state="disabled")
 
         bottom_frame = tk.Frame(main_frame, bg=self.theme["bg_task"])
         bottom_frame.pack(pady=(10, 0), fill="x")
 
-        tk.Label(bottom_frame, text=f"Total : {total_pomodoros} Pomodoros", bg=self.theme["bg_task"], fg=self.theme["fg_main"], font=("Segoe UI", 12, "italic")).pack(side="left", padx=10)
+        tk.Label(bottom_frame, text=f"Total : {summary['total']} Pomodoros", bg=self.theme["bg_task"], fg=self.theme["fg_main"], font=("Segoe UI", 12, "italic")).pack(side="left", padx=10)
         
         clear_button = tk.Button(bottom_frame, text="Tout effacer", command=self._confirm_clear_stats, relief="flat", bg="#DB4437", fg="white")
         clear_button.pack(side="right", padx=10)
 
+    def show_charts(self):
+        """ Affiche l'image en cache tout de suite ; un rendu à jour arrive en arrière-plan. """
+        png = self.parent.stats_charts.get((self.parent.stats_version, self.parent.current_theme, date.today()), self.parent.stats_chart_args)
+        if png is None:
+            self.charts_label.config(text="Calcul des graphiques…", image="")
+            return
+        self.chart_image = tk.PhotoImage(data=base64.b64encode(png))
+        self.charts_label.config(image=self.chart_image, text="")
+
+    def load_next_page(self):
+        """ Ajoute la page suivante de la liste journalière (chargement paresseux au défilement). """
+        days = self.rollups.days_page(self.days_shown, self.PAGE_SIZE)
+        if not days:
+            return
+        stats_data = self.parent.stats
+        lines = []
+        for stat_date in days:
+            count = stats_data.get(stat_date, 0)
+            plural = 's' if count > 1 else ''
+            lines.append(f"{stat_date}: {count} Pomodoro{plural}\n")
+        self.days_shown += len(days)
+        self.stats_text.config(state="normal")
+        self.stats_text.insert(tk.END, "".join(lines))
+        self.stats_text.config(state="disabled")
+
+    def on_stats_scroll(self, first, last):
+        self.stats_scrollbar.set(first, last)
+        if float(last) >= 1.0 and self.days_shown < len(self.rollups.sorted_days):
+            self.after_idle(self.load_next_page)
+
     def _confirm_clear_stats(self):
         if messagebox.askyesno("Confirmer", "Voulez-vous vraiment effacer toutes les statistiques de pomodoros ? Cette action est irréversible.", parent=self):
             self.parent.clear_stats()
             self._build_ui()
 
+# --- Fenêtre des minuteurs parallèles ---
+class MultiTimerWindow(tk.Toplevel):
+    SESSION_NAMES = {"work": "Travail", "short_break": "Pause Courte", "long_break": "Pause Longue", "stopped": "Arrêté"}
+
+    def __init__(self, parent, icon_photo_image=None, close_callback=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.theme = THEMES[parent.current_theme]
+        self.close_callback = close_callback
+        if icon_photo_image: self.iconphoto(False, icon_photo_image)
+        self.title("Minuteurs parallèles")
+        self.geometry("460x420")
+        self.configure(bg=self.theme["bg_task"])
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", self.close_callback)
+
+        add_frame = tk.Frame(self, bg=self.theme["bg_task"])
+        add_frame.pack(pady=10, padx=10, fill="x")
+        self.name_var = tk.StringVar()
+        self.work_var = tk.StringVar(value=str(parent.work_time_min))
+        self.short_break_var = tk.StringVar(value=str(parent.short_break_min))
+        self.long_break_var = tk.StringVar(value=str(parent.long_break_min))
+        self.sessions_var = tk.StringVar(value=str(parent.pomodoros_per_cycle))
+        fields = (("Nom", self.name_var, 12), ("Travail", self.work_var, 3), ("Courte", self.short_break_var, 3),
+                  ("Longue", self.long_break_var, 3), ("Cycle", self.sessions_var, 3))
+        for column, (label_text, variable, width) in enumerate(fields):
+            tk.Label(add_frame, text=label_text, bg=self.theme["bg_task"], fg=self.theme["fg_main"]).grid(row=0, column=column, padx=2, sticky="w")
+            tk.Entry(add_frame, textvariable=variable, width=width, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], insertbackground=self.theme["fg_main"], relief="flat").grid(row=1, column=column, padx=2, ipady=3)
+        tk.Button(add_frame, text="Ajouter", command=self.add_timer, relief="flat", bg="#4CAF50", fg="white").grid(row=1, column=len(fields), padx=(5, 0))
+
+        self.listbox = tk.Listbox(self, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Consolas", 11), relief="flat", highlightthickness=0, activestyle="none")
+        self.listbox.pack(padx=10, expand=True, fill="both")
+
+        button_frame = tk.Frame(self, bg=self.theme["bg_task"])
+        button_frame.pack(pady=10)
+        tk.Button(button_frame, text="Démarrer / Pause", command=lambda: self.on_selected(self.parent.toggle_multi_timer), relief="flat", bg=self.theme["bg_btn_start"], fg="white").pack(side="left", padx=5)
+        tk.Button(button_frame, text="Passer", command=lambda: self.on_selected(self.parent.skip_multi_timer), relief="flat", bg=self.theme["bg_btn_neutral"], fg="white").pack(side="left", padx=5)
+        tk.Button(button_frame, text="Supprimer", command=lambda: self.on_selected(self.parent.remove_multi_timer), relief="flat", bg="#DB4437", fg="white").pack(side="left", padx=5)
+
+        self.names = []
+        self.lines = []
+        self._refresh_job = None
+        self.refresh()
+
+    def add_timer(self):
+        try:
+            name = self.name_var.get().strip()
+            work, short = int(self.work_var.get()), int(self.short_break_var.get())
+            long, sessions = int(self.long_break_var.get()), int(self.sessions_var.get())
+            if not name or name in self.parent.multi_timers.engines:
+                raise ValueError("Nom vide ou déjà utilisé")
+            if not (1 <= work <= 60 and 1 <= short <= 30 and 1 <= long <= 60 and 1 <= sessions <= 10):
+                raise ValueError("Valeurs hors limites")
+        except ValueError as e:
+            logging.error(f"Erreur minuteur parallèle: {e}")
+            messagebox.showerror("Erreur", "Nom unique requis, et nombres valides. (Travail: 1-60, Pauses: 1-60, Cycle: 1-10)", parent=self)
+            return
+        self.parent.add_multi_timer({"name": name, "work_time_min": work, "short_break_min": short, "long_break_min": long, "pomodoros_per_cycle": sessions, "stats": {}})
+        self.name_var.set("")
+        self.refresh()
+
+    def on_selected(self, action):
+        selection = self.listbox.curselection()
+        if selection:
+            action(self.names[selection[0]])
+            self.refresh()
+
+    def destroy(self):
+        if self._refresh_job:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        super().destroy()
+
+    def refresh(self):
+        """ Une seule mise à jour par seconde pour tous les minuteurs ; seules les lignes modifiées sont réécrites. """
+        if self._refresh_job:
+            self.after_cancel(self._refresh_job)
+        engines = self.parent.multi_timers.engines
+        tracks = {track["name"]: track for track in self.parent.timer_tracks}
+        names = list(engines)
+        lines = []
+        for name in names:
+            timer = engines[name].timer
+            state = self.SESSION_NAMES.get(timer.last_state, timer.last_state)
+            if timer.is_paused: state += " (pause)"
+            total = sum(tracks.get(name, {}).get("stats", {}).values())
+            lines.append(f"{name[:16]:<16} {state:<20} {timer.get_time_str()}  🍅 {timer.pomodoro_count}/{timer.pomodoros_per_cycle}  Σ {total}")
+        if names != self.names:
+            self.listbox.delete(0, tk.END)
+            self.listbox.insert(tk.END, *lines)
+        else:
+            for index, line in enumerate(lines):
+                if line != self.lines[index]:
+                    selected = self.listbox.selection_includes(index)
+                    self.listbox.delete(index)
+                    self.listbox.insert(index, line)
+                    if selected: self.listbox.selection_set(index)
+        self.names, self.lines = names, lines
+        self._refresh_job = self.after(1000, self.refresh)
+
+# --- Fenêtre de diagnostic (Ctrl+Maj+D) ---
+class DiagnosticsWindow(tk.Toplevel):
+    REFRESH_MS = 1000
+
+    def __init__(self, parent, icon_photo_image=None, close_callback=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.theme = THEMES[parent.current_theme]
+        self.close_callback = close_callback
+        if icon_photo_image: self.iconphoto(False, icon_photo_image)
+        self.title("Diagnostics")
+        self.geometry("520x460")
+        self.configure(bg=self.theme["bg_task"])
+        self.protocol("WM_DELETE_WINDOW", self.close_callback)
+
+        self.text = tk.Text(self, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Consolas", 10), relief="flat", highlightthickness=0)
+        self.text.pack(expand=True, fill="both", padx=10, pady=10)
+        self._refresh_job = None
+        self.refresh()
+
+    def destroy(self):
+        if self._refresh_job:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+        super().destroy()
+
+    def refresh(self):
+        self.parent.probe_event_loop()
+        snapshot = self.parent.diagnostics.snapshot(self.parent.diagnostics_counters())
+        lines = [f"Depuis {snapshot['duree_s']} s", "", f"{'latence':<24} {'n':>7} {'moy':>8} {'p95<=':>7} {'max':>8}  (ms)"]
+        for name, latency in snapshot["latences"].items():
+            lines.append(f"{name:<24} {latency['n']:>7} {latency['moy_ms']:>8.2f} {latency['p95_ms']:>7} {latency['max_ms']:>8.2f}")
+        lines.append("")
+        for group, counters in snapshot["compteurs"].items():
+            lines.append(f"{group} : " + ", ".join(f"{key}={value}" for key, value in counters.items()))
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, "\n".join(lines))
+        self.text.config(state="disabled")
+        self._refresh_job = self.after(self.REFRESH_MS, self.refresh)
+
 # --- Fenêtre des paramètres ---
 class SettingsWindow(tk.Toplevel):
     def __init__(self, parent, icon_photo_image=None, close_callback=None):
@@ -414,7 +3130,7 @@ class SettingsWindow(tk.Toplevel):
         self.close_callback = close_callback
         if icon_photo_image: self.iconphoto(False, icon_photo_image)
         self.title("Paramètres")
-        self.geometry("380x280")
+        self.geometry("380x310")
         self.configure(bg=self.theme["bg_task"])
         self.transient(parent)
         self.grab_set()
@@ -426,6 +3142,7 @@ class SettingsWindow(tk.Toplevel):
         self.sessions_var = tk.StringVar(value=str(parent.pomodoros_per_cycle))
         self.theme_var = tk.StringVar(value=parent.current_theme)
         self.auto_transition_var = tk.BooleanVar(value=parent.auto_transition)
+        self.progress_ring_var = tk.BooleanVar(value=parent.progress_ring)
 
         main_frame = tk.Frame(self, bg=self.theme["bg_task"], padx=10, pady=10)
         main_frame.pack(expand=True, fill="both")
@@ -456,9 +3173,12 @@ class SettingsWindow(tk.Toplevel):
         auto_trans_check = tk.Checkbutton(main_frame, text="Démarrage auto.", variable=self.auto_transition_var, bg=self.theme["bg_task"], fg=self.theme["fg_main"], selectcolor=self.theme["bg_task_item"], activebackground=self.theme["bg_task"], activeforeground=self.theme["fg_main"], relief="flat", highlightthickness=0)
         auto_trans_check.grid(row=5, column=1, padx=10, pady=5, sticky="w")
 
+        tk.Label(main_frame, text="Progression:", bg=self.theme["bg_task"], fg=self.theme["fg_main"]).grid(row=6, column=0, padx=10, pady=5, sticky="w")
+        ring_check = tk.Checkbutton(main_frame, text="Anneau autour du minuteur", variable=self.progress_ring_var, bg=self.theme["bg_task"], fg=self.theme["fg_main"], selectcolor=self.theme["bg_task_item"], activebackground=self.theme["bg_task"], activeforeground=self.theme["fg_main"], relief="flat", highlightthickness=0)
+        ring_check.grid(row=6, column=1, padx=10, pady=5, sticky="w")
 
         button_frame = tk.Frame(main_frame, bg=self.theme["bg_task"])
-        button_frame.grid(row=6, columnspan=2, pady=10)
+        button_frame.grid(row=7, columnspan=2, pady=10)
         tk.Button(button_frame, text="Enregistrer", command=self.save_settings).pack(side="left", padx=5)
         tk.Button(button_frame, text="Annuler", command=self.close_callback).pack(side="left", padx=5)
 
@@ -477,6 +3197,8 @@ class SettingsWindow(tk.Toplevel):
             self.parent.long_break_min = long
             self.parent.pomodoros_per_cycle = sessions
             self.parent.auto_transition = self.auto_transition_var.get()
+            self.parent.progress_ring = self.progress_ring_var.get()
+            self.parent.timer_canvas.set_ring_visible(self.parent.progress_ring)
             
             new_theme = self.theme_var.get()
             if self.parent.current_theme != new_theme:
@@ -492,55 +3214,102 @@ class SettingsWindow(tk.Toplevel):
 
 # --- Application Principale ---
 class PomodoroApp(tk.Tk):
+    SAVE_DEBOUNCE_MS = 500
+
     def __init__(self):
-        super().__init__()
+        with startup_profiler.phase("création Tk"):
+            super().__init__()
         self.title("Focus Pomodoro")
-        self.data_manager = DataManager()
-        self.tray_icon_cache = {}
+        self._save_job = None
+        self.tray_renderer = TrayIconRenderer()
         
-        data = self.data_manager.load_data()
+        with startup_profiler.phase("chargement données et stats"):
+            self.data_manager = create_data_manager()
+            with tracer.span("data.load"):
+                data = self.data_manager.load_data()
+                self.stats = self.data_manager.load_stats()
+        self._stats_rollups = None
+        # Incrémenté uniquement quand les données des graphiques changent
+        self.stats_version = 0
+        self.stats_charts = StatsChartCache(lambda key, png: self.ui_commands.post("on_stats_charts_rendered", key, png))
+        self.session_records = SessionRecordStore(get_app_data_path("sessions"))
+        self.session_records.load_aggregates_async()
         self.work_time_min = data["work_time_min"]
         self.short_break_min = data["short_break_min"]
         self.long_break_min = data["long_break_min"]
         self.pomodoros_per_cycle = data["pomodoros_per_cycle"]
         self.current_theme = data["theme"]
         self.auto_transition = data["auto_transition"]
+        self.progress_ring = data["progress_ring"]
         self.tasks = data["tasks"]
-        self.stats = self.data_manager.load_stats()
+        self._task_index = None
+        self.timer_tracks = [dict(track, stats=dict(track.get("stats", {}))) for track in data["timers"]]
         
-        self.timer = TimerLogic(
-            self.work_time_min,
-            self.short_break_min,
-            self.long_break_min,
-            self.pomodoros_per_cycle
-        )
+        self.new_engine()
         
         self.theme = THEMES[self.current_theme]
 
-        try:
-            # Utilise resource_path pour les icônes qui sont des ressources
-            icon_pil_image = Image.open(resource_path('Icon.png'))
-            self.icon_photo_image = ImageTk.PhotoImage(icon_pil_image)
-            self.iconphoto(False, self.icon_photo_image)
-        except Exception as e:
-            logging.warning(f"Icon.png non trouvé: {e}")
+        # L'icône est décodée par Tk (sans PIL) juste après le premier affichage
+        self.icon_photo_image = None
+        self.after_idle(self.load_window_icon)
 
         self.geometry("560x480")
         self.minsize(550, 400)
         self.protocol("WM_DELETE_WINDOW", self.quit_app)
         self.bind("<Unmap>", self.on_unmap)
+        # Panneau de diagnostic volontairement absent des menus
+        self.bind("<Control-Shift-D>", lambda e: self.open_diagnostics())
         self.hiding_to_tray = False
         self.tasks_window = None
         self.settings_window = None
         self.about_window = None
         self.stats_window = None
-        self._timer_job, self.tray_icon = None, None
-        self.title_font = font.Font(family="Segoe UI", size=28)
-        self.timer_font = font.Font(family="Segoe UI Light", size=110, weight="bold")
-        self.button_font = font.Font(family="Segoe UI", size=14)
-        self.icon_button_font = font.Font(family="Segoe UI", size=18)
-        self._create_widgets()
-        self.reset_to_initial_state()
+        self._timer_job, self.tray = None, None
+        self.diagnostics = DiagnosticsMonitor(get_app_data_path("diagnostics.json"))
+        self.diagnostics_window = None
+        self.ui_commands = UiCommandQueue(self, self.diagnostics)
+        self.ui_commands.start()
+        self.control_server = ControlServer(self.ui_commands)
+        self.after_idle(self.control_server.start)
+        self.multi_timer_window = None
+        self._multi_timer_job = None
+        self.multi_timers = MultiTimerEngine(on_pomodoro_completed=self.log_track_pomodoro)
+        for track in self.timer_tracks:
+            self.multi_timers.add_timer(track["name"], track["work_time_min"], track["short_break_min"], track["long_break_min"], track["pomodoros_per_cycle"], self.auto_transition)
+        self.tick_counts = {"wakeups": 0, "wakeups_hidden": 0, "probes": 0}
+        self.view = ViewModel()
+        self.checkpoint = SessionCheckpoint(get_app_data_path("session.ckpt"))
+        # Lu avant reset_to_initial_state, dont publish_state réécrit le point de reprise
+        saved_session = self.checkpoint.read()
+        self.banner_window = None
+        self._banner_job = None
+        self.audio = AudioPlayer()
+        self.notifier = NotificationDispatcher(default_notification_backend, fallback=BannerBackend(self))
+        with startup_profiler.phase("polices et widgets"):
+            self.title_font = font.Font(family="Segoe UI", size=28)
+            self.timer_font = font.Font(family="Segoe UI Light", size=110, weight="bold")
+            self.button_font = font.Font(family="Segoe UI", size=14)
+            self.icon_button_font = font.Font(family="Segoe UI", size=18)
+            self._create_widgets()
+            self.reset_to_initial_state()
+        self.resume_from_checkpoint(saved_session)
+
+    def report_startup_profile(self):
+        with startup_profiler.phase("premier affichage"):
+            self.update_idletasks()
+        report = startup_profiler.report()
+        print(report)
+        logging.info(report)
+        self.destroy()
+
+    def load_window_icon(self):
+        try:
+            # Utilise resource_path pour les icônes qui sont des ressources
+            with startup_profiler.phase("icône de fenêtre"):
+                self.icon_photo_image = tk.PhotoImage(file=resource_path('Icon.png'))
+                self.iconphoto(False, self.icon_photo_image)
+        except Exception as e:
+            logging.warning(f"Icon.png non trouvé: {e}")
 
     def _create_widgets(self):
         self.main_frame = tk.Frame(self)
@@ -555,12 +3324,21 @@ class PomodoroApp(tk.Tk):
         self.settings_button.pack(side="left")
         self.about_button = tk.Button(self.top_button_frame, text="ℹ️", font=self.icon_button_font, command=self.open_about, relief="flat", borderwidth=0, padx=5)
         self.about_button.pack(side="left")
+        self.multi_timer_button = tk.Button(self.top_button_frame, text="⏱️", font=self.icon_button_font, command=self.open_multi_timers, relief="flat", borderwidth=0, padx=5)
+        self.multi_timer_button.pack(side="left")
         self.session_title_label = tk.Label(self.main_frame, text="Prêt à commencer ?", font=self.title_font)
         self.session_title_label.pack(pady=(0, 10))
-        self.timer_label = tk.Label(self.main_frame, text="25:00", font=self.timer_font)
-        self.timer_label.pack(expand=True, fill="both")
+        # Taille fixe, centré dans l'espace libre : un changement de texte ne relance aucune disposition
+        self.timer_canvas = TimerCanvas(self.main_frame, self.timer_font, self.view, show_ring=self.progress_ring)
+        self.timer_canvas.pack(expand=True)
+        # Largeur fixe mesurée sur la police : la fenêtre ne doit jamais la rogner (main_frame a padx=10)
+        min_width = self.timer_canvas.winfo_reqwidth() + 2 * 10
+        self.minsize(max(550, min_width), 400)
+        if min_width > 560:
+            self.geometry(f"{min_width}x480")
         self.cycle_indicator_frame = tk.Frame(self.main_frame)
         self.cycle_indicator_frame.pack(pady=10)
+        self.cycle_indicator = CycleIndicator(self.cycle_indicator_frame)
         self.button_frame = tk.Frame(self.main_frame)
         self.button_frame.pack(pady=(10, 20))
         self.start_pause_button = tk.Button(self.button_frame, text="Démarrer", font=self.button_font, command=self.start_pause_button_click, relief="flat", borderwidth=0, width=12, height=1)
@@ -571,6 +3349,20 @@ class PomodoroApp(tk.Tk):
         self.skip_button.pack(side="left", padx=5)
 
     def save_data(self):
+        """ Demande une sauvegarde ; les appels rapprochés sont regroupés en une seule écriture. """
+        if self._save_job is None:
+            self._save_job = self.after(self.SAVE_DEBOUNCE_MS, self._write_data)
+
+    @traced("data.flush")
+    def flush_data(self):
+        if self._save_job is not None:
+            self.after_cancel(self._save_job)
+        self._write_data()
+        self.data_manager.flush()
+
+    @traced("data.save")
+    def _write_data(self):
+        self._save_job = None
         data = {
             "work_time_min": self.work_time_min,
             "short_break_min": self.short_break_min,
@@ -578,31 +3370,80 @@ class PomodoroApp(tk.Tk):
             "pomodoros_per_cycle": self.pomodoros_per_cycle,
             "theme": self.current_theme,
             "auto_transition": self.auto_transition,
+            "progress_ring": self.progress_ring,
+            "timers": self.timer_tracks,
             "tasks": self.tasks
         }
         self.data_manager.save_data(data)
 
+    def on_task_added(self, task):
+        if self._task_index is not None: self._task_index.add(task)
+        if not self.data_manager.add_task(task): self.save_data()
+
+    def on_task_updated(self, task):
+        if self._task_index is not None: self._task_index.update(task)
+        if not self.data_manager.update_task(task): self.save_data()
+
+    def on_task_deleted(self, task):
+        if self._task_index is not None: self._task_index.remove(task)
+        if not self.data_manager.delete_task(task): self.save_data()
+
+    @property
+    def task_index(self):
+        # Construit à la première ouverture des tâches, puis tenu à jour par on_task_*
+        if self._task_index is None:
+            self._task_index = TaskIndex(self.tasks)
+        return self._task_index
+
+    @traced("data.save_stats")
     def save_stats(self):
-        self.data_manager.save_stats(self.stats)
+        self.data_manager.save_stats()
+
+    @property
+    def stats_rollups(self):
+        # Construit au premier besoin, puis tenu à jour incrémentalement
+        if self._stats_rollups is None:
+            self._stats_rollups = StatsRollups(self.stats)
+        return self._stats_rollups
 
+    @traced("data.record_pomodoro")
     def log_completed_pomodoro(self):
+        # self.stats est l'index du journal : un simple ajout d'une ligne le met à jour
         today = str(date.today())
-        self.stats[today] = self.stats.get(today, 0) + 1
-        self.save_stats()
+        # En cas d'échec, self.stats n'a pas changé : les agrégats non plus
+        if not self.data_manager.record_pomodoro(today):
+            return
+        self.stats_version += 1
+        if self._stats_rollups is not None:
+            self._stats_rollups.add(today)
         
     def clear_stats(self):
-        self.stats.clear()
-        self.save_stats()
+        if not self.data_manager.clear_stats():
+            return
+        self.session_records.clear()
+        self.stats_version += 1
+        if self._stats_rollups is not None:
+            self._stats_rollups.reset()
+
+    def stats_chart_args(self):
+        """ Données transmises au processus de rendu : les jours depuis le lundi d'il y a 52 semaines. """
+        today = date.today()
+        start_ordinal = today.toordinal() - today.weekday() - 52 * 7
+        counts = [self.stats.get(str(date.fromordinal(ordinal)), 0) for ordinal in range(start_ordinal, today.toordinal() + 1)]
+        colors = {"bg": self.theme["bg_task_item"], "accent": self.theme["bg_work"], "fg": self.theme["fg_main"]}
+        return start_ordinal, counts, colors
+
+    def on_stats_charts_rendered(self, key, png):
+        self.stats_charts.store(key, png)
+        if self.stats_window and self.stats_window.winfo_exists():
+            self.stats_window.show_charts()
+
+    def record_session(self, ended, next_state, skipped):
+        # Appelé par le moteur après timer.stop() : remaining est le temps non décompté
+        self.session_records.end(self.timer.session_duration(ended) - self.timer.remaining, skipped)
         
     def play_sound(self, sound_type):
-        if not SOUND_ENABLED: return
-        def _play():
-            try:
-                if sound_type == "start": winsound.Beep(800, 100)
-                elif sound_type == "warning": winsound.Beep(1200, 250)
-                elif sound_type == "end_session": winsound.PlaySound("SystemAsterisk", winsound.SND_ALIAS)
-            except Exception as e: logging.error(f"Erreur son: {e}")
-        threading.Thread(target=_play, daemon=True).start()
+        self.audio.play(sound_type)
 
     def start_pause_button_click(self):
         if self.timer.is_paused: 
@@ -612,42 +3453,32 @@ class PomodoroApp(tk.Tk):
         else:
             self.play_sound("start")
             self.hide_to_tray()
-            session_to_start = 'work' if self.timer.last_state in ['stopped', 'short_break', 'long_break'] else self.timer.last_state
-            self.start_session(session_to_start)
+            self.start_session(self.engine.first_session_type())
 
     def reset_button_click(self):
-        if self._timer_job: 
-            self.after_cancel(self._timer_job)
+        self.cancel_timer_job()
         self.reset_to_initial_state()
 
     def skip_button_click(self):
-        if self._timer_job: 
-            self.after_cancel(self._timer_job)
+        self.cancel_timer_job()
         self.play_sound("end_session")
-        if self.timer.last_state == 'work': 
-            self.timer.pomodoro_count += 1
-            self.log_completed_pomodoro()
-        next_state = self.timer.determine_next_session_type()
+        next_state = self.engine.end_session(skipped=True)
+        self.enter_session(next_state)
+
+    def enter_session(self, session_type):
         if self.auto_transition:
-            self.start_session(next_state)
+            self.start_session(session_type)
         else:
-            self.prepare_next_session(next_state)
+            self.prepare_next_session(session_type)
 
+    @traced("session.end")
     def handle_session_end(self):
-        self.timer.is_running = False
         self.play_sound("end_session")
-
-        if self.timer.last_state == 'work':
-            self.timer.pomodoro_count += 1
-            self.log_completed_pomodoro()
-        
-        self.update_cycle_indicator()
+        next_state = self.engine.end_session()
         
         if not self.auto_transition and self.state() == 'withdrawn': 
             self.show_window()
             self.lift()
-
-        next_state = self.timer.determine_next_session_type()
         
         message = ""
         if next_state == "work": 
@@ -658,51 +3489,72 @@ class PomodoroApp(tk.Tk):
             message = f"Excellent ! Cycle de {self.pomodoros_per_cycle} sessions terminé. Profitez de votre pause longue !"
         
         self.show_notification("Focus Pomodoro - C'est l'heure de changer !", message)
-        
-        if self.auto_transition:
-            self.start_session(next_state)
+        self.enter_session(next_state)
+
+    def prepare_next_session(self, session_type, remaining=None):
+        """ Session en attente ; avec remaining, session reprise en pause là où elle s'était arrêtée. """
+        self.engine.prepare(session_type)
+        planned = self.timer.session_duration(session_type)
+        if remaining is None:
+            self.session_records.begin(session_type, planned)
+            suffix = " (en attente)"
         else:
-            self.prepare_next_session(next_state)
-
-    def prepare_next_session(self, session_type):
-        self.timer.last_state = session_type
-        self.timer.is_running = True
-        self.timer.is_paused = True
+            self.timer.current_time_sec = remaining
+            self.session_records.begin(session_type, planned, elapsed=planned - remaining, resumed=True)
+            suffix = " (en pause)"
         if session_type == "work":
-            self.timer.current_time_sec = self.timer.work_time_sec
             title, color_key = "Travail", "bg_work"
         elif session_type == "short_break":
-            self.timer.current_time_sec = self.timer.short_break_time_sec
             title, color_key = "Pause Courte", "bg_short_break"
         else:
-            self.timer.current_time_sec = self.timer.long_break_time_sec
             title, color_key = "Pause Longue", "bg_long_break"
         
-        self.session_title_label.config(text=title + " (en attente)")
+        self.view.set(self.session_title_label, text=title + suffix)
         self.apply_theme(color_key)
         self.update_start_pause_button("Reprendre", self.theme["bg_btn_start"])
         self.update_cycle_indicator()
         self.update_timer_display()
-        if self.tray_icon and self.tray_icon.visible:
+        if self.tray and self.tray.visible:
             self.update_tray_display()
+        self.publish_state("session_ready" if remaining is None else "pause")
 
     def show_notification(self, title, message):
-        try:
-            if sys.platform == "win32":
-                from win10toast import ToastNotifier
-                toaster = ToastNotifier()
-                toaster.show_toast(title, message, icon_path=resource_path("Icon.ico"), duration=5, threaded=True)
-            else:
-                messagebox.showinfo(title, message)
-        except ImportError:
-            logging.warning("win10toast non trouvé. pip install win10toast")
-            messagebox.showinfo(title, message)
-        except Exception as e:
-            logging.error(f"Erreur de notification: {e}")
-            messagebox.showinfo(title, message)
-
-    def start_session(self, session_type):
-        self.timer.start_session(session_type)
+        # Mise en file seulement : l'affichage se fait sur le thread des notifications
+        self.notifier.notify(title, message)
+
+    def show_banner(self, title, message):
+        """ Bandeau non modal en bas à droite de l'écran, fermé automatiquement. """
+        self.close_banner()
+        banner = tk.Toplevel(self)
+        banner.overrideredirect(True)
+        banner.attributes("-topmost", True)
+        banner.configure(bg=self.theme["bg_task_item"], padx=12, pady=8)
+        tk.Label(banner, text=title, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Segoe UI", 11, "bold"), anchor="w").pack(fill="x")
+        tk.Label(banner, text=message, bg=self.theme["bg_task_item"], fg=self.theme["fg_main"], font=("Segoe UI", 10), anchor="w", wraplength=320, justify="left").pack(fill="x")
+        banner.bind("<Button-1>", lambda e: self.close_banner())
+        banner.update_idletasks()
+        x = banner.winfo_screenwidth() - banner.winfo_reqwidth() - 20
+        y = banner.winfo_screenheight() - banner.winfo_reqheight() - 60
+        banner.geometry(f"+{x}+{y}")
+        self._banner_job = self.after(6000, self.close_banner)
+        self.banner_window = banner
+
+    def close_banner(self):
+        if self._banner_job:
+            self.after_cancel(self._banner_job)
+            self._banner_job = None
+        if self.banner_window is not None and self.banner_window.winfo_exists():
+            self.banner_window.destroy()
+        self.banner_window = None
+
+    def start_session(self, session_type, remaining=None):
+        self.cancel_timer_job()
+        self.engine.start(session_type, remaining)
+        planned = self.timer.session_duration(session_type)
+        if remaining is None:
+            self.session_records.begin(session_type, planned)
+        else:
+            self.session_records.begin(session_type, planned, elapsed=planned - remaining, resumed=True)
         if session_type == "work":
             title, color_key = "Travail", "bg_work"
         elif session_type == "short_break":
@@ -710,113 +3562,233 @@ class PomodoroApp(tk.Tk):
         else:
             title, color_key = "Pause Longue", "bg_long_break"
         
-        self.session_title_label.config(text=title)
+        self.view.set(self.session_title_label, text=title)
         self.apply_theme(color_key)
         self.update_start_pause_button("Pause", self.theme["bg_btn_pause"])
         self.update_cycle_indicator()
+        self.publish_state("session_start")
         self.timer_tick()
 
     def pause_timer(self):
         if self.timer.is_running and not self.timer.is_paused:
-            self.timer.pause()
-            if self._timer_job: 
-                self.after_cancel(self._timer_job)
-            current_title = self.session_title_label.cget('text')
+            self.engine.pause()
+            self.session_records.note_pause()
+            self.cancel_timer_job()
+            current_title = self.view.get(self.session_title_label, 'text')
             if " (en pause)" not in current_title and " (en attente)" not in current_title:
-                self.session_title_label.config(text=current_title + " (en pause)")
+                self.view.set(self.session_title_label, text=current_title + " (en pause)")
             self.update_start_pause_button("Reprendre", self.theme["bg_btn_start"])
+            self.publish_state("pause")
 
     def resume_timer(self):
         if self.timer.is_running and self.timer.is_paused:
-            self.timer.resume()
-            current_title = self.session_title_label.cget('text')
+            self.engine.resume()
+            current_title = self.view.get(self.session_title_label, 'text')
             base_title = current_title.replace(" (en pause)", "").replace(" (en attente)", "")
-            self.session_title_label.config(text=base_title)
+            self.view.set(self.session_title_label, text=base_title)
             self.update_start_pause_button("Pause", self.theme["bg_btn_pause"])
+            self.publish_state("resume")
             self.timer_tick()
 
+    @traced("timer_tick")
     def timer_tick(self):
-        self.update_timer_display()
-        if self.tray_icon and self.tray_icon.visible: 
+        self._timer_job = None
+        self.diagnostics.tick_fired()
+        hidden = self.hiding_to_tray
+        self.tick_counts["wakeups"] += 1
+        if hidden:
+            self.tick_counts["wakeups_hidden"] += 1
+        else:
+            # Inutile de mettre à jour un label invisible ; show_window rafraîchit l'affichage
+            self.update_timer_display()
+        if self.tray and self.tray.visible: 
             self.update_tray_display()
+        if self.control_server.subscriber_count:
+            self.control_server.publish("tick")
+        self.checkpoint.write(self.timer)
+        if self.diagnostics.snapshot_due():
+            self.write_diagnostics_snapshot()
         
-        if self.timer.last_state == "work" and self.timer.current_time_sec == 60: 
+        if self.timer.consume_warning(): 
             self.play_sound("warning")
         
-        if self.timer.tick():
-            self._timer_job = self.after(1000, self.timer_tick)
+        if self.timer.is_expired():
+            self.handle_session_end()
+        elif self.timer.is_counting():
+            # Réveil aligné sur l'échéance : chaque seconde si visible, sinon au prochain changement
+            # visible dans la barre des tâches (minute, dernière minute, fin de session)
+            if hidden and not self.control_server.subscriber_count:
+                delay = self.timer.seconds_until_next_minute_change()
+            else:
+                delay = self.timer.seconds_until_next_tick()
+            delay_ms = max(1, int(delay * 1000))
+            self.diagnostics.expect(delay_ms / 1000)
+            self._timer_job = self.after(delay_ms, self.timer_tick)
+
+    def on_first_subscriber(self):
+        """ Premier abonné à l'API locale : retour immédiat au rythme d'une seconde. """
+        if self.timer.is_counting():
+            self.cancel_timer_job()
+            self.timer_tick()
+
+    def cancel_timer_job(self):
+        if self._timer_job: 
+            self.after_cancel(self._timer_job)
+            self._timer_job = None
+        self.diagnostics.cancel()
+
+    def probe_event_loop(self):
+        """ Mesure le délai avant qu'un rappel after(0) soit traité par la boucle Tk. """
+        posted_at = time.monotonic()
+        self.after(0, lambda: self.diagnostics.record("boucle_tk.retard", (time.monotonic() - posted_at) * 1000))
+
+    def diagnostics_counters(self):
+        return {
+            "minuteur": dict(self.tick_counts),
+            "file_tk": {"reveils": self.ui_commands.polls},
+            "vue": {"appels_tk": self.view.tk_calls, "appels_tk_par_s": round(self.view.rate(), 2),
+                    "evites": self.view.skipped, "icone": self.view.tray_updates},
+            "cache_icones": self.tray_renderer.stats(),
+            "icone": {"appliquees": self.tray.applied, "remplacees": self.tray.superseded} if self.tray else {},
+            "graphiques": {"rendus": self.stats_charts.renders, "version": self.stats_version},
+            "notifications": dict(self.notifier.metrics),
+            "sons": {"abandonnes": self.audio.dropped},
+            "api_locale": {"abonnes": self.control_server.subscriber_count, "evenements_perdus": self.control_server.dropped_events},
+            "point_de_reprise": {"ecritures": self.checkpoint.writes},
+        }
+
+    def write_diagnostics_snapshot(self):
+        # Appelé depuis timer_tick : pas de réveil dédié, seulement la sonde after(0), comptée
+        self.tick_counts["probes"] += 1
+        self.probe_event_loop()
+        self.diagnostics.write_snapshot(self.diagnostics_counters())
+
+    def open_diagnostics(self):
+        if not self.diagnostics_window or not self.diagnostics_window.winfo_exists():
+            self.diagnostics_window = DiagnosticsWindow(self, self.icon_photo_image, lambda: self.on_window_close('diagnostics'))
+        self.diagnostics_window.lift()
+
+    def publish_state(self, event_type):
+        # Chaque changement d'état passe par ici : point de reprise synchronisé sur disque
+        self.checkpoint.write(self.timer, sync=True)
+        self.control_server.publish(event_type, {
+            "state": self.timer.last_state,
+            "remaining": self.timer.remaining,
+            "running": self.timer.is_running,
+            "paused": self.timer.is_paused,
+            "pomodoro_count": self.timer.pomodoro_count,
+        })
+
+    def resume_from_checkpoint(self, saved):
+        """ Reprend la session interrompue (crash, redémarrage) en tenant compte du temps écoulé ;
+            saved est le résultat de SessionCheckpoint.read() lu au démarrage. """
+        if saved is None:
+            return
+        self.timer.pomodoro_count = saved["pomodoro_count"]
+        if saved["paused"]:
+            remaining = saved["remaining"]
         else:
-            if self.timer.is_running:
-                self.handle_session_end()
+            remaining = max(0.0, saved["remaining"] - max(0.0, time.time() - saved["saved_at"]))
+        logging.info(f"Reprise de la session {saved['state']} ({remaining:.0f} s restantes)")
+        if saved["paused"]:
+            self.prepare_next_session(saved["state"], remaining)
+            self.timer.warning_played = saved["warning_played"]
+            self.checkpoint.write(self.timer, sync=True)
+        else:
+            # Une session arrivée à échéance pendant l'arrêt est terminée normalement par le premier tick
+            self.start_session(saved["state"], remaining)
 
-    def reset_to_initial_state(self):
+    def remote_start(self):
+        """ Commande « start » de l'API locale : démarre, ou reprend une session en attente. """
+        if self.timer.is_paused:
+            self.resume_timer()
+        elif not self.timer.is_running:
+            self.start_session(self.engine.first_session_type())
+
+    def add_task_from_text(self, text):
+        task_data = {'text': text, 'done': False}
+        self.tasks.append(task_data)
+        self.on_task_added(task_data)
+        if self.tasks_window and self.tasks_window.winfo_exists():
+            self.tasks_window.redraw_tasks()
+
+    def new_engine(self):
         self.timer = TimerLogic(
             self.work_time_min,
             self.short_break_min,
             self.long_break_min,
             self.pomodoros_per_cycle
         )
+        self.engine = SessionEngine(self.timer, self.auto_transition, on_pomodoro_completed=self.log_completed_pomodoro,
+                                    on_transition=self.record_session)
+        self.session_records.discard()
+
+    def reset_to_initial_state(self):
+        self.new_engine()
         self.update_timer_display()
         self.update_cycle_indicator()
-        self.session_title_label.config(text="Prêt à commencer ?")
+        self.view.set(self.session_title_label, text="Prêt à commencer ?")
         self.apply_theme()
         self.update_start_pause_button("Démarrer", self.theme["bg_btn_start"])
+        self.publish_state("reset")
 
     def update_timer_display(self):
-        self.timer_label.config(text=self.timer.get_time_str())
+        self.timer_canvas.set_time(self.timer.get_time_str())
+        if self.progress_ring:
+            elapsed = 1 - self.timer.remaining / self.timer.session_duration(self.timer.last_state) if self.timer.is_running else 0
+            self.timer_canvas.set_progress(elapsed)
 
     def update_start_pause_button(self, text, color):
-        self.start_pause_button.config(text=text, bg=color, fg='white')
+        self.view.set(self.start_pause_button, text=text, bg=color, fg='white')
 
     def update_cycle_indicator(self):
-        for widget in self.cycle_indicator_frame.winfo_children():
-            widget.destroy()
-        bg_color = self.cget('bg')
-        self.cycle_indicator_frame.configure(bg=bg_color)
-        for i in range(self.pomodoros_per_cycle):
-            fg_color = self.theme["fg_main"] if i < self.timer.pomodoro_count else "#ACACAC"
-            tk.Label(self.cycle_indicator_frame, text="🍅", font=("Segoe UI Emoji", 26), fg=fg_color, bg=bg_color).pack(side="left")
+        self.cycle_indicator.update(self.pomodoros_per_cycle, self.timer.pomodoro_count, self.theme["fg_main"], self.view.get(self, 'bg'))
     
     def apply_theme(self, state_color_key=None):
         self.theme = THEMES[self.current_theme]
         bg_color = self.theme.get(state_color_key, self.theme["bg_main"])
         fg_color = self.theme["fg_main"]
-        self.configure(bg=bg_color)
+        self.state_colors = {"work": self.theme["bg_work"], "short_break": self.theme["bg_short_break"], "long_break": self.theme["bg_long_break"]}
+        # Le modèle de vue ignore les widgets déjà dans la bonne couleur
+        self.view.set(self, bg=bg_color)
         bg_widgets = [self.main_frame, self.top_button_frame, self.cycle_indicator_frame, self.button_frame]
         for widget in bg_widgets:
-            widget.configure(bg=bg_color)
-        text_widgets = [self.session_title_label, self.timer_label, self.tasks_button, self.stats_button, self.settings_button, self.about_button]
-        for widget in text_widgets:
-            widget.configure(bg=bg_color, fg=fg_color)
-        self.reset_button.configure(bg=self.theme["bg_btn_neutral"], fg='white')
-        self.skip_button.configure(bg=self.theme["bg_btn_neutral"], fg='white')
-        current_start_text = self.start_pause_button.cget('text')
+            self.view.set(widget, bg=bg_color)
+        self.view.set(self.session_title_label, bg=bg_color, fg=fg_color)
+        self.timer_canvas.set_colors(bg_color, fg_color, self.theme["bg_btn_neutral"])
+        for btn in [self.tasks_button, self.stats_button, self.settings_button, self.about_button, self.multi_timer_button]:
+            self.view.set(btn, bg=bg_color, fg=fg_color, activebackground=bg_color, activeforeground="#BBBBBB")
+        self.view.set(self.reset_button, bg=self.theme["bg_btn_neutral"], fg='white')
+        self.view.set(self.skip_button, bg=self.theme["bg_btn_neutral"], fg='white')
+        current_start_text = self.view.get(self.start_pause_button, 'text')
         if current_start_text in ["Démarrer", "Reprendre"]:
             self.update_start_pause_button(current_start_text, self.theme["bg_btn_start"])
         else:
             self.update_start_pause_button(current_start_text, self.theme["bg_btn_pause"])
-        for btn in [self.tasks_button, self.stats_button, self.settings_button, self.about_button]:
-            btn.configure(activebackground=bg_color, activeforeground="#BBBBBB")
         self.update_cycle_indicator()
 
+    @traced("window.settings")
     def open_settings(self):
         if not self.settings_window or not self.settings_window.winfo_exists():
             self.settings_window = SettingsWindow(self, self.icon_photo_image, lambda: self.on_window_close('settings'))
             self.settings_window.lift()
         else: self.settings_window.lift()
 
+    @traced("window.tasks")
     def open_tasks(self):
         if not self.tasks_window or not self.tasks_window.winfo_exists():
             self.tasks_window = TasksWindow(self, self.icon_photo_image, lambda: self.on_window_close('tasks'))
             self.tasks_window.lift()
         else: self.tasks_window.lift()
 
+    @traced("window.about")
     def open_about(self):
         if not self.about_window or not self.about_window.winfo_exists():
             self.about_window = AboutWindow(self, self.icon_photo_image, lambda: self.on_window_close('about'))
             self.about_window.lift()
         else: self.about_window.lift()
 
+    @traced("window.stats")
     def open_stats(self):
         if not self.stats_window or not self.stats_window.winfo_exists():
             self.stats_window = StatsWindow(self, self.icon_photo_image, lambda: self.on_window_close('stats'))
@@ -824,8 +3796,64 @@ class PomodoroApp(tk.Tk):
         else:
             self.stats_window.lift()
 
+    @traced("window.multi_timers")
+    def open_multi_timers(self):
+        if not self.multi_timer_window or not self.multi_timer_window.winfo_exists():
+            self.multi_timer_window = MultiTimerWindow(self, self.icon_photo_image, lambda: self.on_window_close('multi_timers'))
+            self.multi_timer_window.lift()
+        else:
+            self.multi_timer_window.lift()
+
+    def add_multi_timer(self, track):
+        self.timer_tracks.append(track)
+        self.multi_timers.add_timer(track["name"], track["work_time_min"], track["short_break_min"], track["long_break_min"], track["pomodoros_per_cycle"], self.auto_transition)
+        self.save_data()
+
+    def remove_multi_timer(self, name):
+        self.multi_timers.remove_timer(name)
+        self.timer_tracks = [track for track in self.timer_tracks if track["name"] != name]
+        self.save_data()
+        self.arm_multi_timer_job()
+
+    def toggle_multi_timer(self, name):
+        self.multi_timers.toggle(name)
+        self.arm_multi_timer_job()
+
+    def skip_multi_timer(self, name):
+        self.multi_timers.skip(name)
+        self.arm_multi_timer_job()
+
+    def arm_multi_timer_job(self):
+        """ Un seul after() pour tous les minuteurs parallèles, sur l'échéance la plus proche. """
+        if self._multi_timer_job:
+            self.after_cancel(self._multi_timer_job)
+            self._multi_timer_job = None
+        delay = self.multi_timers.seconds_until_next_deadline()
+        if delay is not None:
+            self._multi_timer_job = self.after(max(1, int(delay * 1000) + 5), self.on_multi_timer_due)
+
+    def on_multi_timer_due(self):
+        self._multi_timer_job = None
+        transitions = self.multi_timers.process_due()
+        if transitions:
+            # Un seul son et une seule notification pour toutes les sessions échues ensemble
+            self.play_sound("end_session")
+            summary = ", ".join(f"{name} → {MultiTimerWindow.SESSION_NAMES.get(next_state, next_state)}" for name, _, next_state in transitions[:5])
+            if len(transitions) > 5:
+                summary += f" (+{len(transitions) - 5})"
+            self.show_notification("Focus Pomodoro - Minuteurs parallèles", summary)
+        self.arm_multi_timer_job()
+
+    def log_track_pomodoro(self, name):
+        for track in self.timer_tracks:
+            if track["name"] == name:
+                today = str(date.today())
+                track["stats"][today] = track["stats"].get(today, 0) + 1
+                self.save_data()
+                break
+
     def on_window_close(self, window_type):
-        window_map = {'tasks': 'tasks_window', 'settings': 'settings_window', 'about': 'about_window', 'stats': 'stats_window'}
+        window_map = {'tasks': 'tasks_window', 'settings': 'settings_window', 'about': 'about_window', 'stats': 'stats_window', 'multi_timers': 'multi_timer_window', 'diagnostics': 'diagnostics_window'}
         window_attribute_name = window_map.get(window_type)
         if window_attribute_name:
             window_instance = getattr(self, window_attribute_name, None)
@@ -833,77 +3861,108 @@ class PomodoroApp(tk.Tk):
                 window_instance.destroy()
             setattr(self, window_attribute_name, None)
 
-    def safe_show_window(self): self.after(0, self.show_window)
-    def safe_skip_button_click(self): self.after(0, self.skip_button_click)
-    def safe_quit_app(self): self.after(0, self.quit_app)
-    def safe_open_tasks(self): self.after(0, self.open_tasks)
-    def safe_show_and_open_tasks(self):
-        self.safe_show_window()
-        self.after(100, self.safe_open_tasks)
+    def show_and_open_tasks(self):
+        self.show_window()
+        self.after(100, self.open_tasks)
 
     def create_image_with_text(self, color_name, time_text):
-        cache_key = (color_name, time_text)
-        if cache_key in self.tray_icon_cache:
-            return self.tray_icon_cache[cache_key]
-        image = Image.new('RGB', (64, 64), color_name)
-        draw = ImageDraw.Draw(image)
-        try: 
-            font = ImageFont.truetype("arial.ttf", 48)
-        except IOError: 
-            font = ImageFont.load_default()
-        bbox = draw.textbbox((0, 0), time_text, font=font)
-        text_width = bbox[2] - bbox[0]; text_height = bbox[3] - bbox[1]
-        position = ((64 - text_width) / 2, (64 - text_height) / 2 - bbox[1])
-        draw.text(position, time_text, font=font, fill="white")
-        self.tray_icon_cache[cache_key] = image
-        return image
-
-    def run_tray_icon(self):
-        try:
-            menu = (pystray.MenuItem('Afficher', self.safe_show_window, default=True),
-                    pystray.MenuItem('Afficher les tâches', self.safe_show_and_open_tasks),
-                    pystray.MenuItem('Passer', self.safe_skip_button_click),
-                    pystray.MenuItem('Quitter', self.safe_quit_app))
-            self.tray_icon = pystray.Icon("Focus Pomodoro", self.create_image_with_text("black", ""), "Focus Pomodoro", menu)
-            self.tray_icon.run()
-        except Exception as e: 
-            logging.error(f"Erreur création icône barre des tâches: {e}")
+        return self.tray_renderer.get(color_name, time_text)
 
     def on_unmap(self, event):
         if self.state() == 'iconic': self.hide_to_tray()
 
     def hide_to_tray(self):
-        if self.hiding_to_tray or (self.tray_icon and self.tray_icon.visible): return
+        if self.hiding_to_tray or (self.tray and self.tray.visible): return
+        if self.tray is None:
+            pystray = import_pystray()
+            if pystray is None: return
+            # Pré-rendu des icônes (PIL) seulement quand la barre des tâches sert pour la première fois
+            self.tray_renderer.prerender_async(["black"] + [self.theme[key] for key in ("bg_work", "bg_short_break", "bg_long_break")])
+            self.tray = TrayController(pystray, self.create_image_with_text("black", ""), self.ui_commands, self.diagnostics)
         self.hiding_to_tray = True
         self.withdraw()
-        threading.Thread(target=self.run_tray_icon, daemon=True).start()
+        self.tray.show()
+        self.update_tray_display()
 
     def show_window(self):
-        if self.tray_icon: 
-            self.tray_icon.stop()
-            self.tray_icon = None
+        if self.tray: 
+            self.tray.hide()
         self.deiconify()
         self.lift()
         self.hiding_to_tray = False
+        # Retour au rythme d'une seconde dès que la fenêtre est visible
+        if self.timer.is_counting():
+            self.cancel_timer_job()
+            self.timer_tick()
+        else:
+            self.update_timer_display()
 
     def quit_app(self):
         if messagebox.askyesno("Quitter Focus Pomodoro", "Êtes-vous sûr de vouloir quitter ?"):
-            self.save_data()
+            logging.info(f"Réveils du minuteur : {self.tick_counts['wakeups']} (dont {self.tick_counts['wakeups_hidden']} en arrière-plan), "
+                         f"{self.ui_commands.polls} relevés de la file Tk")
+            logging.info(f"Appels Tk : {self.view.tk_calls} ({self.view.rate():.1f}/s récemment), {self.view.skipped} évités, "
+                         f"{self.view.tray_updates} mises à jour de l'icône")
+            self.flush_data()
             self.save_stats()
-            if self.tray_icon: 
-                self.tray_icon.stop()
+            self.diagnostics.write_snapshot(self.diagnostics_counters())
+            self.diagnostics.writer.flush()
+            # Fermeture volontaire : la session reprendra en pause au prochain lancement
+            self.checkpoint.write(self.timer, sync=True, paused=True)
+            self.checkpoint.close()
+            if self.tray: 
+                self.tray.stop()
+            self.control_server.stop()
+            self.ui_commands.stop()
+            self.stats_charts.shutdown()
+            if tracer.enabled:
+                report = tracer.report()
+                print(report)
+                logging.info(report)
             self.destroy()
             sys.exit(0)
 
+    @traced("tray.update")
     def update_tray_display(self):
-        if not self.tray_icon or not self.tray_icon.visible: return
+        if not self.tray or not self.tray.visible: return
         minutes, seconds = divmod(self.timer.current_time_sec, 60)
         time_str = f"{minutes:02d}" if minutes > 0 else f"{seconds:02d}"
-        color_map = {"work": self.theme["bg_work"], "short_break": self.theme["bg_short_break"], "long_break": self.theme["bg_long_break"]}
-        icon_bg_color = color_map.get(self.timer.last_state, self.theme["bg_main"])
-        self.tray_icon.icon = self.create_image_with_text(icon_bg_color, time_str)
-        self.tray_icon.title = f"{self.session_title_label.cget('text')} - {self.timer.get_time_str()}"
+        icon_bg_color = self.state_colors.get(self.timer.last_state, self.theme["bg_main"])
+        if self.hiding_to_tray:
+            # Réveils espacés en arrière-plan : l'info-bulle suit la précision de l'icône
+            remaining_str = f"{minutes} min" if minutes > 0 else f"{seconds} s"
+        else:
+            remaining_str = self.timer.get_time_str()
+        self.view.set_tray(self.tray, (icon_bg_color, time_str),
+                           f"{self.view.get(self.session_title_label, 'text')} - {remaining_str}",
+                           self.create_image_with_text)
 
 if __name__ == "__main__":
+    # Nécessaire pour le processus de rendu des graphiques dans la version empaquetée
+    lazy_import("multiprocessing").freeze_support()
+    if "--bench-engine" in sys.argv:
+        for scenario, result in run_engine_benchmark().items():
+            print(f"{scenario}: {result['transitions']} transitions, {result['ns_par_transition']:.0f} ns/transition, "
+                  f"{result['blocs_alloues_nets']} blocs nets, pic {result['pic_memoire_octets']} o, {result['erreurs']} erreurs")
+        sys.exit(0)
+    if "--bench-display" in sys.argv:
+        results = run_display_benchmark()
+        print(f"Image du minuteur : Label {results['label']:.0f} µs, Canvas {results['canvas']:.0f} µs")
+        sys.exit(0)
+    if "--bench-tray" in sys.argv:
+        print(f"Rendu icône : {TrayIconRenderer().benchmark():.0f} images/s")
+        sys.exit(0)
+    # Une seule instance : un second lancement transmet ses actions à la première et se termine
+    cli_actions = parse_cli_actions(sys.argv[1:])
+    instance_lock = InstanceLock(get_app_data_path("instance.lock"))
+    if not instance_lock.acquire():
+        if forward_to_running_instance(cli_actions):
+            sys.exit(0)
+        print("Focus Pomodoro est déjà lancé mais ne répond pas.", file=sys.stderr)
+        sys.exit(1)
     app = PomodoroApp()
+    for command, argument in cli_actions:
+        app.ui_commands.post(ControlServer.COMMANDS[command], *([argument] if argument else []))
+    if startup_profiler.enabled:
+        app.after_idle(app.report_startup_profile)
     app.mainloop()